@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { QuizSession, Answer, QuizApiError } from '../types/quiz';
+import { QuizSession, Answer, QuizApiError, LeaderboardEntry } from '../types/quiz';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000/api/v1';
 
@@ -25,6 +25,20 @@ export const quizApi = {
     }
   },
 
+  async getLeaderboard(sessionId: string): Promise<LeaderboardEntry[]> {
+    try {
+      const response = await axiosInstance.get<LeaderboardEntry[]>(
+        `/quizzes/sessions/${sessionId}/leaderboard`
+      );
+      return response.data;
+    } catch (error) {
+      if (axios.isAxiosError(error) && error.response?.data) {
+        throw error.response.data as QuizApiError;
+      }
+      throw error;
+    }
+  },
+
   async submitAnswer(answer: Answer): Promise<void> {
     try {
       await axiosInstance.post(
@@ -1,4 +1,4 @@
-import React, { FC, useState, useCallback } from 'react';
+import React, { FC, useState, useCallback, useEffect, useRef } from 'react';
 import { useQuizWebSocket } from '../hooks/useQuizWebSocket';
 import { Question } from './Question';
 import { Leaderboard } from './Leaderboard';
@@ -14,6 +14,11 @@ import {
 } from '../types/quiz';
 import '../styles/Quiz.css';
 
+// How long out-of-order roster deltas wait for the missing ones before the
+// client falls back to fetching the full roster. With several server nodes
+// each node flushes its own joins, so deltas routinely arrive out of order.
+const ROSTER_GAP_TIMEOUT_MS = 2000;
+
 interface QuizProps {
   sessionId: string;
   userId: string;
@@ -30,6 +35,60 @@ export const Quiz: FC<QuizProps> = ({ sessionId, userId, isAdmin, onComplete })
   const [error, setError] = useState<string | null>(null);
   const [participants, setParticipants] = useState<Set<string>>(new Set());
   const [isSubmitting, setIsSubmitting] = useState(false);
+  const answerSeq = useRef(0);
+  const rosterVersion = useRef<number | null>(null);
+  const sendRef = useRef<(message: unknown) => boolean>(() => false);
+  // Deltas that arrived ahead of a missing one, keyed by from_version
+  const pendingDeltas = useRef<Map<number, WebSocketMessage>>(new Map());
+  const rosterGapTimer = useRef<ReturnType<typeof setTimeout> | null>(null);
+
+  const applyPendingDeltas = useCallback(() => {
+    const pending = pendingDeltas.current;
+    const joined: string[] = [];
+    const left: string[] = [];
+    let next = rosterVersion.current !== null ? pending.get(rosterVersion.current) : undefined;
+    while (next !== undefined) {
+      pending.delete(rosterVersion.current as number);
+      rosterVersion.current = next.version;
+      (next.joined || []).forEach((user: string) => joined.push(user));
+      (next.left || []).forEach((user: string) => left.push(user));
+      next = pending.get(next.version);
+    }
+    pending.forEach((delta, fromVersion) => {
+      if (rosterVersion.current !== null && delta.version <= rosterVersion.current) {
+        pending.delete(fromVersion);
+      }
+    });
+
+    if (joined.length || left.length) {
+      setParticipants(prev => {
+        const updated = new Set(prev);
+        joined.forEach(user => updated.add(user));
+        left.forEach(user => updated.delete(user));
+        return updated;
+      });
+    }
+
+    if (pending.size === 0) {
+      if (rosterGapTimer.current !== null) {
+        clearTimeout(rosterGapTimer.current);
+        rosterGapTimer.current = null;
+      }
+    } else if (rosterGapTimer.current === null) {
+      rosterGapTimer.current = setTimeout(() => {
+        // The missing delta never came, fetch the full roster instead
+        rosterGapTimer.current = null;
+        pendingDeltas.current.clear();
+        sendRef.current({ type: 'roster_resync' });
+      }, ROSTER_GAP_TIMEOUT_MS);
+    }
+  }, []);
+
+  useEffect(() => () => {
+    if (rosterGapTimer.current !== null) {
+      clearTimeout(rosterGapTimer.current);
+    }
+  }, []);
 
   const handleMessage = useCallback((message: WebSocketMessage) => {
     console.log('Received message:', message);
@@ -71,6 +130,8 @@ export const Quiz: FC<QuizProps> = ({ sessionId, userId, isAdmin, onComplete })
           console.log('Updating participants:', sessionMsg.participants);
           setParticipants(new Set(sessionMsg.participants));
         }
+        rosterVersion.current = sessionMsg.roster_version ?? null;
+        applyPendingDeltas();
         break;
       }
 
@@ -118,6 +179,39 @@ export const Quiz: FC<QuizProps> = ({ sessionId, userId, isAdmin, onComplete })
         break;
       }
 
+      case 'answer_ack': {
+        setIsSubmitting(false);
+        setError(null);
+        console.log(message.is_correct ? 'Correct!' : 'Incorrect');
+        break;
+      }
+
+      case 'answer_error': {
+        setIsSubmitting(false);
+        setError(message.error || 'Failed to submit answer');
+        break;
+      }
+
+      case 'leaderboard_update': {
+        if (message.leaderboard) {
+          setLeaderboard(message.leaderboard);
+          break;
+        }
+        const changes: LeaderboardEntry[] = message.changes || [];
+        const removed = new Set<string>(message.removed || []);
+        setLeaderboard(prev => {
+          const byUser = new Map<string, LeaderboardEntry>();
+          prev.forEach((entry, index) => {
+            if (!removed.has(entry.user_id)) {
+              byUser.set(entry.user_id, { ...entry, rank: entry.rank ?? index + 1 });
+            }
+          });
+          changes.forEach(entry => byUser.set(entry.user_id, entry));
+          return Array.from(byUser.values()).sort((a, b) => (a.rank ?? 0) - (b.rank ?? 0));
+        });
+        break;
+      }
+
       case 'quiz_completed': {
         setSession(prev => {
           if (!prev) return prev;
@@ -157,6 +251,28 @@ export const Quiz: FC<QuizProps> = ({ sessionId, userId, isAdmin, onComplete })
         break;
       }
 
+      case 'roster_delta': {
+        if (rosterVersion.current !== null && message.version <= rosterVersion.current) {
+          break;
+        }
+        if (rosterVersion.current === null) {
+          sendRef.current({ type: 'roster_resync' });
+          break;
+        }
+        pendingDeltas.current.set(message.from_version, message);
+        applyPendingDeltas();
+        break;
+      }
+
+      case 'roster_snapshot': {
+        if (rosterVersion.current === null || message.version >= rosterVersion.current) {
+          rosterVersion.current = message.version;
+          setParticipants(new Set(message.participants));
+          applyPendingDeltas();
+        }
+        break;
+      }
+
       case 'connection_closed': {
         setError(`${message.reason}. This session is no longer active.`);
         break;
@@ -169,9 +285,9 @@ export const Quiz: FC<QuizProps> = ({ sessionId, userId, isAdmin, onComplete })
         break;
       }
     }
-  }, [userId, onComplete]);
+  }, [userId, onComplete, applyPendingDeltas]);
 
-  const { isConnected, reconnect } = useQuizWebSocket({
+  const { isConnected, sendMessage, reconnect } = useQuizWebSocket({
     sessionId,
     userId,
     onMessage: handleMessage,
@@ -183,6 +299,7 @@ export const Quiz: FC<QuizProps> = ({ sessionId, userId, isAdmin, onComplete })
 
         setSession(sessionData);
         setParticipants(new Set(sessionData.participants));
+        setLeaderboard(await quizApi.getLeaderboard(sessionId));
 
         if (sessionData.status === 'active' && sessionData.questions?.length > 0) {
           const currentQuestionIndex = sessionData.current_question || 0;
@@ -204,11 +321,24 @@ export const Quiz: FC<QuizProps> = ({ sessionId, userId, isAdmin, onComplete })
       }
     },
   });
+  sendRef.current = sendMessage;
 
   const handleSubmitAnswer = async () => {
     if (!currentQuestion || !selectedAnswer || isSubmitting) return;
 
     setIsSubmitting(true);
+    answerSeq.current += 1;
+    const sent = sendMessage({
+      type: 'answer',
+      id: answerSeq.current,
+      question_id: currentQuestion.id,
+      answer: selectedAnswer,
+    });
+    if (sent) {
+      // Settled by the matching answer_ack or answer_error message
+      return;
+    }
+
     try {
       await quizApi.submitAnswer({
         session_id: sessionId,
@@ -16,6 +16,7 @@ export interface SessionStateMessage {
   current_question: number;
   questions: Question[];
   participants: string[];
+  roster_version?: number;
   quiz_id: string;
   start_time: string;
 }
@@ -33,6 +34,7 @@ export interface Question {
 export interface LeaderboardEntry {
   user_id: string;
   score: number;
+  rank?: number;
 }
 
 export interface Answer {
@@ -2,9 +2,13 @@ import logging
 import asyncio
 
 
+from app.core.metrics import ACTIVE_SESSIONS, ACTIVE_SOCKETS, ANSWER_QUEUE_DEPTH
 from app.services.quiz_service import QuizService
 from app.models.quiz import Quiz, Answer, QuizSession
+from app.websockets.backend import RedisBroadcastBackend
+from app.websockets.codec import MalformedMessage, negotiate_codec, receive_message
 from app.websockets.manager import manager
+from fastapi.responses import StreamingResponse
 from fastapi import (
     APIRouter,
     Depends,
@@ -13,8 +17,10 @@ from fastapi import (
     WebSocketDisconnect,
     status,
     Query,
+    Request,
 )
-from typing import Dict, List, Optional
+from pydantic import ValidationError
+from typing import Dict, List, Optional, Set
 
 router = APIRouter()
 quiz_service = QuizService()
@@ -24,10 +30,18 @@ logger = logging.getLogger(__name__)
 @router.on_event("startup")
 async def startup_event():
     await quiz_service.setup()
+    ACTIVE_SESSIONS.set_function(manager.get_session_count)
+    ACTIVE_SOCKETS.set_function(manager.get_connection_count)
+    ANSWER_QUEUE_DEPTH.set_function(lambda: quiz_service.answer_writer.queue_depth)
+    if quiz_service.settings.BROADCAST_BACKEND == "redis":
+        await manager.start_backend(
+            RedisBroadcastBackend(quiz_service.settings.REDIS_URL)
+        )
 
 
 @router.on_event("shutdown")
 async def shutdown_event():
+    await manager.stop_backend()
     await quiz_service.cleanup()
 
 
@@ -37,12 +51,24 @@ async def create_quiz(quiz: Quiz) -> Quiz:
     return await quiz_service.create_quiz(quiz)
 
 
+@router.post("/quizzes/import")
+async def import_quizzes(request: Request) -> Dict:
+    """Import quizzes from an NDJSON body with one quiz per line"""
+    return await quiz_service.import_quizzes(request.stream())
+
+
+@router.get("/quizzes/indexes")
+async def get_index_report() -> Dict[str, List[str]]:
+    """Report missing and unused MongoDB indexes"""
+    return await quiz_service.check_indexes()
+
+
 @router.post("/quizzes/sessions", response_model=QuizSession)
 async def create_quiz_session(
     quiz_id: str = Query(..., description="ID of the quiz to create a session for")
 ):
     """Create a new quiz session"""
-    logger.info(f"Creating new session for quiz: {quiz_id}")
+    logger.info("Creating new session for quiz: %s", quiz_id)
     return await quiz_service.create_session(quiz_id)
 
 
@@ -68,7 +94,7 @@ async def start_quiz_session(session_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error starting session: {str(e)}")
+        logger.error("Error starting session: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to start session: {str(e)}"
         )
@@ -88,63 +114,183 @@ async def get_quiz_leaderboard(session_id: str, limit: int = 10):
     return await quiz_service.get_leaderboard(session_id, limit)
 
 
+@router.get("/quizzes/sessions/{session_id}/archive")
+async def get_session_archive(session_id: str) -> Dict:
+    """Get the final standings and summary of a completed session"""
+    archive = await quiz_service.get_archive(session_id)
+    if archive is None:
+        raise HTTPException(status_code=404, detail="Session archive not found")
+    return archive.document
+
+
+@router.get("/quizzes/sessions/{session_id}/stats")
+async def get_session_stats(session_id: str) -> Dict:
+    """Get per-question accuracy, answer distributions, answer times and
+    score percentiles of a completed session"""
+    return await quiz_service.get_session_stats(session_id)
+
+
+@router.get("/quizzes/sessions/{session_id}/leaderboard/ranks")
+async def get_leaderboard_ranks(
+    session_id: str, user_id: List[str] = Query(..., description="Users to rank")
+) -> Dict:
+    """Get the rank and score of one or more users"""
+    return await quiz_service.get_ranks(session_id, user_id)
+
+
+@router.get("/quizzes/sessions/{session_id}/leaderboard/window")
+async def get_leaderboard_window(
+    session_id: str, user_id: str, radius: int = Query(5, ge=0)
+) -> Dict:
+    """Get a user's rank and the players ranked around them"""
+    return await quiz_service.get_rank_window(session_id, user_id, radius)
+
+
+@router.get("/quizzes/sessions/{session_id}/leaderboard/page")
+async def get_leaderboard_page(
+    session_id: str, cursor: int = Query(0, ge=0), limit: int = Query(100, ge=1)
+) -> Dict:
+    """Get one page of the ranked leaderboard"""
+    return await quiz_service.get_leaderboard_page(session_id, cursor, limit)
+
+
+@router.get("/quizzes/sessions/{session_id}/questions/{question_id}/distribution")
+async def get_answer_distribution(session_id: str, question_id: str) -> Dict:
+    """Get how many players picked each option of a question"""
+    return await quiz_service.get_answer_distribution(session_id, question_id)
+
+
+@router.get("/quizzes/sessions/{session_id}/export")
+async def export_quiz_session(
+    session_id: str,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+):
+    """Stream a session's answers and standings as NDJSON or CSV"""
+    stream = await quiz_service.export_session(session_id, format)
+    return StreamingResponse(
+        stream,
+        media_type="text/csv" if format == "csv" else "application/x-ndjson",
+        headers={
+            "Content-Disposition": f'attachment; filename="{session_id}.{format}"'
+        },
+    )
+
+
+async def handle_socket_answer(
+    websocket: WebSocket, session_id: str, user_id: str, data: Dict
+):
+    """Score an answer sent over the socket and reply with its correlation id"""
+    request_id = data.get("id")
+    try:
+        answer = Answer(
+            session_id=session_id,
+            user_id=user_id,
+            question_id=data.get("question_id"),
+            answer=data.get("answer"),
+        )
+        result = await quiz_service.submit_answer(answer)
+        reply = {"type": "answer_ack", "id": request_id, **result}
+    except ValidationError:
+        reply = {
+            "type": "answer_error",
+            "id": request_id,
+            "status_code": 422,
+            "error": "Invalid answer message",
+        }
+    except HTTPException as e:
+        reply = {
+            "type": "answer_error",
+            "id": request_id,
+            "status_code": e.status_code,
+            "error": e.detail,
+        }
+    await manager.send_personal(websocket, reply)
+
+
 @router.websocket("/quizzes/sessions/{session_id}/ws/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str, user_id: str):
     """WebSocket endpoint for real-time quiz updates"""
-    logger.info(
-        f"New WebSocket connection request: session={session_id}, user={user_id}"
+    logger.debug(
+        "New WebSocket connection request: session=%s, user=%s", session_id, user_id
     )
 
+    # Answers being scored for this socket, replies may arrive out of order
+    in_flight: Set[asyncio.Task] = set()
+
     try:
-        await websocket.accept()
-        logger.info(f"WebSocket connection accepted for user {user_id}")
+        codec, subprotocol = negotiate_codec(websocket, manager.codecs)
+        await websocket.accept(subprotocol=subprotocol)
+        logger.debug(
+            "WebSocket connection accepted for user %s (%s)", user_id, codec.name
+        )
 
-        await manager.connect(websocket, session_id, user_id)
+        await manager.connect(websocket, session_id, user_id, codec)
 
         try:
-            session = await quiz_service.get_session(session_id)
-            if not session:
-                logger.error(f"Session not found: {session_id}")
-                await websocket.send_json(
-                    {"type": "error", "error": "Session not found"}
+            snapshot = await quiz_service.get_session_snapshot(session_id)
+            if snapshot is None:
+                logger.error("Session not found: %s", session_id)
+                await manager.send_personal(
+                    websocket, {"type": "error", "error": "Session not found"}
                 )
                 return
 
-            await websocket.send_json(
-                {
-                    "type": "session_state",
-                    "session_id": session_id,
-                    "status": session.status,
-                    "current_question": session.current_question,
-                    "total_questions": (
-                        len(session.questions) if session.questions else 0
-                    ),
-                    "questions": [q.model_dump() for q in session.questions],
-                    "participants": session.participants,
-                }
-            )
+            await manager.send_personal(websocket, snapshot)
 
-            session = await quiz_service.add_participant(
-                session_id, user_id, notify=True
-            )
+            await quiz_service.add_participant(session_id, user_id, notify=True)
 
             while True:
                 try:
-                    data = await websocket.receive_json()
-                    logger.debug(f"Received message from user {user_id}: {data}")
+                    data = await receive_message(websocket, codec)
+                    logger.debug("Received message from user %s: %s", user_id, data)
 
                     if data.get("type") == "ping":
-                        await websocket.send_json({"type": "pong"})
+                        await manager.send_personal(websocket, {"type": "pong"})
+                        continue
+
+                    if data.get("type") == "roster_resync":
+                        await manager.send_personal(
+                            websocket, await quiz_service.get_roster(session_id)
+                        )
+                        continue
+
+                    if data.get("type") == "answer":
+                        limit = quiz_service.settings.WS_MAX_INFLIGHT_ANSWERS
+                        if len(in_flight) >= limit:
+                            await manager.send_personal(
+                                websocket,
+                                {
+                                    "type": "answer_error",
+                                    "id": data.get("id"),
+                                    "status_code": 429,
+                                    "error": "Too many answers in flight",
+                                },
+                            )
+                            continue
+                        task = asyncio.create_task(
+                            handle_socket_answer(websocket, session_id, user_id, data)
+                        )
+                        in_flight.add(task)
+                        task.add_done_callback(in_flight.discard)
                         continue
 
                 except WebSocketDisconnect:
-                    logger.info(f"WebSocket disconnected for user {user_id}")
+                    logger.info("WebSocket disconnected for user %s", user_id)
                     break
+                except MalformedMessage as e:
+                    await manager.send_personal(
+                        websocket, {"type": "error", "error": f"Malformed message: {e}"}
+                    )
+                    continue
                 except Exception as e:
-                    logger.error(f"Error processing message: {e}")
+                    logger.error("Error processing message: %s", e)
                     break
 
         finally:
+            if in_flight:
+                # Answers already received are still scored
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
             user_fully_disconnected = await manager.disconnect(
                 websocket, session_id, user_id
             )
@@ -154,15 +300,19 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str, user_id: str
                     await quiz_service.remove_participant(
                         session_id, user_id, notify=True
                     )
-                    logger.info(
-                        f"User {user_id} fully disconnected from session {session_id}"
+                    logger.debug(
+                        "User %s fully disconnected from session %s",
+                        user_id,
+                        session_id,
                     )
                 except Exception as e:
-                    logger.error(f"Error handling participant departure: {e}")
+                    logger.error("Error handling participant departure: %s", e)
             else:
-                logger.info(
-                    f"User {user_id} still has other connections to session {session_id}"
+                logger.debug(
+                    "User %s still has other connections to session %s",
+                    user_id,
+                    session_id,
                 )
 
     except Exception as e:
-        logger.error(f"WebSocket error for user {user_id}: {e}")
+        logger.error("WebSocket error for user %s: %s", user_id, e)
@@ -1,5 +1,6 @@
 import os
 from functools import lru_cache
+from typing import Dict
 from urllib.parse import quote_plus
 
 from pydantic_settings import BaseSettings
@@ -17,12 +18,93 @@ class Settings(BaseSettings):
     MONGODB_PORT: str = os.getenv("MONGODB_PORT", "27017")
     MONGODB_DB: str = os.getenv("MONGODB_DB", "quiz_db")
     MONGODB_URL: str = ""
+    MONGODB_RETENTION_DAYS: int = 30  # sessions, 0 disables their TTL index
+    # Answers, archives and stats; 0 keeps them, exports and stats read them
+    MONGODB_RESULTS_RETENTION_DAYS: int = 0
 
     REDIS_HOST: str = os.getenv("REDIS_HOST", "redis")
     REDIS_PORT: str = os.getenv("REDIS_PORT", "6379")
     REDIS_PASSWORD: str = os.getenv("REDIS_PASSWORD", "")
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://redis:6379")
 
+    QUIZ_IMPORT_BATCH_SIZE: int = 500
+    QUIZ_IMPORT_MAX_LINE_BYTES: int = 1024 * 1024
+    QUIZ_IMPORT_MAX_ERRORS: int = 100
+
+    EXPORT_BATCH_SIZE: int = 1000
+    EXPORT_CHUNK_BYTES: int = 64 * 1024
+
+    # Compute a session's session_stats document as soon as it completes,
+    # otherwise on the first read
+    SESSION_STATS_PRECOMPUTE: bool = True
+
+    SESSION_TTL_SECONDS: int = 3600
+    QUIZ_CACHE_SIZE: int = 256
+    QUIZ_CACHE_TTL_SECONDS: int = 300
+    # Archives hold a session's whole standings, keep only a few in memory
+    ARCHIVE_CACHE_SIZE: int = 16
+    REDIS_MIGRATE_LEGACY_SESSIONS: bool = True
+    SESSION_SNAPSHOT_CACHE_SIZE: int = 1024
+    SESSION_SNAPSHOT_TTL_SECONDS: int = 60
+
+    # Added to a question's time limit for how long repeat submits are deduped
+    ANSWER_DEDUPE_GRACE_SECONDS: int = 30
+    ANSWER_BUFFER_MAX_SIZE: int = 50000
+    ANSWER_BUFFER_BATCH_SIZE: int = 1000
+    ANSWER_BUFFER_FLUSH_INTERVAL_MS: int = 200
+    # Backoff between attempts when MongoDB is unreachable, doubling per try
+    ANSWER_WRITE_RETRY_BACKOFF_MS: int = 100
+    ANSWER_WRITE_RETRY_MAX_BACKOFF_MS: int = 5000
+
+    LEADERBOARD_BROADCAST_INTERVAL_MS: int = 500
+    LEADERBOARD_BROADCAST_SIZE: int = 10
+    LEADERBOARD_BROADCAST_DELTAS: bool = True
+    LEADERBOARD_MAX_BATCH: int = 100  # users or entries per rank query
+
+    ANSWER_DISTRIBUTION_BROADCAST: bool = False
+    ANSWER_DISTRIBUTION_BROADCAST_INTERVAL_MS: int = 1000
+
+    # "full" broadcasts participant_joined/participant_left with the whole
+    # list on every change. "delta" batches joins and leaves into
+    # roster_delta messages, which only clients that handle them understand.
+    ROSTER_UPDATE_MODE: str = "full"
+    ROSTER_DELTA_INTERVAL_MS: int = 250
+
+    # Serialize each live session's state changes through an in-process
+    # actor that keeps the header and roster in memory. Needs every request
+    # for a session to reach the same node (single node or sticky routing).
+    SESSION_ACTOR_MODE: bool = False
+    SESSION_ACTOR_BATCH_SIZE: int = 256  # commands persisted per write
+    SESSION_ACTOR_IDLE_SECONDS: int = 300
+
+    SCHEDULER_TICK_MS: int = 100
+    SCHEDULER_LEASE_GRACE_MS: int = 5000
+    SCHEDULER_SWEEP_INTERVAL_MS: int = 5000
+
+    WS_SEND_QUEUE_SIZE: int = 256
+    BROADCAST_BACKEND: str = "local"  # "local" or "redis"
+    WS_MAX_INFLIGHT_ANSWERS: int = 8
+    WS_MSGPACK_ENABLED: bool = True
+    # Encoded size in bytes from which msgpack frames are deflated, per
+    # message type; "default" covers the rest and 0 disables compression
+    WS_COMPRESSION_THRESHOLDS: Dict[str, int] = {
+        "session_state": 1024,
+        "next_question": 2048,
+        "default": 8192,
+    }
+
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # "json" or "text"
+    LOG_QUEUE_SIZE: int = 10000  # records beyond this are dropped, not awaited
+    # Fraction of records below WARNING kept, by logger name prefix
+    LOG_SAMPLE_RATES: Dict[str, float] = {}
+    # Records per second allowed, by logger name prefix
+    LOG_RATE_LIMITS: Dict[str, float] = {
+        "app.websockets": 100,
+        "app.api.v1.quiz": 100,
+        "app.services.quiz_service": 200,
+    }
+
     JWT_SECRET: str = os.getenv("JWT_SECRET", "your-secret-key")
 
     class Config:
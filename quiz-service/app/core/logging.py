@@ -0,0 +1,190 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import get_settings
+from prometheus_client import Counter
+
+LOG_RECORDS_DROPPED = Counter(
+    "quiz_log_records_dropped_total",
+    "Log records dropped before reaching the output",
+    ["reason"],
+)
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Attributes every record has; anything else was passed through ``extra``
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {
+    "message",
+    "asctime",
+    "taskName",
+}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with ``extra`` fields as top-level keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class LazyQueueHandler(QueueHandler):
+    """Queues records for the writer thread without formatting them.
+
+    The stock ``prepare`` renders the message on the logging thread. Here
+    records are queued as they are, so interpolation, encoding and I/O all
+    happen on the writer thread; arguments must therefore not be mutated
+    after logging. A full queue drops the record instead of blocking.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.labels("queue_full").inc()
+
+
+class BlockingStopListener(QueueListener):
+    """Waits for room in a full queue to stop, instead of raising"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+def _match(rules: Dict[str, float], name: str, default: float) -> float:
+    """Value of the longest logger name prefix in ``rules`` matching ``name``"""
+    best = None
+    for prefix in rules:
+        if prefix == "" or name == prefix or name.startswith(prefix + "."):
+            if best is None or len(prefix) > len(best):
+                best = prefix
+    return rules[best] if best is not None else default
+
+
+class RecordLimiter(logging.Filter):
+    """Per-logger sampling and rate limits.
+
+    Rules are keyed by logger name prefix and the longest match wins.
+    Sampling only thins records below WARNING. Rate limits are token
+    buckets per logger; the next record let through after a burst carries
+    the number suppressed before it as ``suppressed``.
+    """
+
+    def __init__(
+        self, sample_rates: Dict[str, float], rate_limits: Dict[str, float]
+    ):
+        super().__init__()
+        self.sample_rates = sample_rates
+        self.rate_limits = rate_limits
+        # logger name -> (sample rate, records per second)
+        self._rules: Dict[str, Tuple[float, float]] = {}
+        # logger name -> [tokens, last refill, suppressed]
+        self._buckets: Dict[str, List] = {}
+
+    def _rule(self, name: str) -> Tuple[float, float]:
+        rule = self._rules.get(name)
+        if rule is None:
+            rule = self._rules[name] = (
+                _match(self.sample_rates, name, 1.0),
+                _match(self.rate_limits, name, 0.0),
+            )
+        return rule
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        sample_rate, rate_limit = self._rule(record.name)
+        if (
+            sample_rate < 1.0
+            and record.levelno < logging.WARNING
+            and random.random() >= sample_rate
+        ):
+            LOG_RECORDS_DROPPED.labels("sampled").inc()
+            return False
+        if rate_limit <= 0:
+            return True
+
+        now = time.monotonic()
+        capacity = max(rate_limit, 1.0)
+        bucket = self._buckets.get(record.name)
+        if bucket is None:
+            bucket = self._buckets[record.name] = [capacity, now, 0]
+        bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate_limit)
+        bucket[1] = now
+        if bucket[0] < 1:
+            bucket[2] += 1
+            LOG_RECORDS_DROPPED.labels("rate_limited").inc()
+            return False
+
+        bucket[0] -= 1
+        if bucket[2]:
+            record.suppressed = bucket[2]
+            bucket[2] = 0
+        return True
+
+
+def setup_logging() -> QueueListener:
+    """Route all records through a bounded queue drained by a background
+    thread, so logging never waits on output I/O"""
+    global _listener
+    settings = get_settings()
+    shutdown_logging()
+
+    output = logging.StreamHandler(sys.stderr)
+    if settings.LOG_FORMAT == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    handler = LazyQueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+    handler.addFilter(
+        RecordLimiter(settings.LOG_SAMPLE_RATES, settings.LOG_RATE_LIMITS)
+    )
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(settings.LOG_LEVEL)
+
+    _listener = BlockingStopListener(
+        handler.queue, output, respect_handler_level=True
+    )
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """Write out queued records and stop the background thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
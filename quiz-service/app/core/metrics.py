@@ -0,0 +1,154 @@
+import asyncio
+import functools
+import logging
+import time
+from typing import Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+from pymongo import monitoring
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+SERVICE_LATENCY = Histogram(
+    "quiz_service_method_seconds",
+    "Latency of QuizService methods",
+    ["method"],
+    buckets=LATENCY_BUCKETS,
+)
+REDIS_LATENCY = Histogram(
+    "quiz_redis_command_seconds",
+    "Redis round trips by command, pipelines count as one round trip",
+    ["command"],
+    buckets=LATENCY_BUCKETS,
+)
+MONGODB_LATENCY = Histogram(
+    "quiz_mongodb_command_seconds",
+    "MongoDB round trips by command",
+    ["command"],
+    buckets=LATENCY_BUCKETS,
+)
+BROADCAST_FANOUT = Histogram(
+    "quiz_broadcast_recipients",
+    "Local sockets a broadcast was queued for",
+    buckets=(1, 10, 50, 100, 500, 1000, 2500, 5000, 10000),
+)
+BROADCAST_LATENCY = Histogram(
+    "quiz_broadcast_seconds",
+    "Time to queue a broadcast for every local socket",
+    buckets=LATENCY_BUCKETS,
+)
+EVENT_LOOP_LAG = Gauge(
+    "quiz_event_loop_lag_seconds", "Delay of the last event loop lag probe"
+)
+ACTIVE_SESSIONS = Gauge(
+    "quiz_active_sessions", "Sessions with at least one local socket"
+)
+ACTIVE_SOCKETS = Gauge("quiz_active_sockets", "Open local WebSocket connections")
+ANSWER_QUEUE_DEPTH = Gauge(
+    "quiz_answer_buffer_depth", "Answers waiting in the write-behind buffer"
+)
+ANSWER_FLUSH_LATENCY = Histogram(
+    "quiz_answer_flush_seconds",
+    "Time to persist one batch of buffered answers, retries included",
+    buckets=LATENCY_BUCKETS + (10.0, 30.0),
+)
+CACHE_LOOKUPS = Counter(
+    "quiz_cache_lookups_total",
+    "In-memory cache lookups by cache and result (hit or miss)",
+    ["cache", "result"],
+)
+CACHE_EVICTIONS = Counter(
+    "quiz_cache_evictions_total",
+    "Entries dropped from an in-memory cache to stay within its size",
+    ["cache"],
+)
+CACHE_SIZE = Gauge("quiz_cache_entries", "Entries held by an in-memory cache", ["cache"])
+
+
+def timed(method: str):
+    """Record the latency of an async QuizService method"""
+    histogram = SERVICE_LATENCY.labels(method)
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started)
+
+        return wrapper
+
+    return decorator
+
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        started = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            REDIS_LATENCY.labels("PIPELINE").observe(time.perf_counter() - started)
+
+
+class InstrumentedRedis(Redis):
+    """Redis client recording the latency of every round trip"""
+
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_LATENCY.labels(str(args[0]).upper()).observe(
+                time.perf_counter() - started
+            )
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None):
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo listener recording the latency of every MongoDB command"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGODB_LATENCY.labels(event.command_name).observe(
+            event.duration_micros / 1e6
+        )
+
+    def failed(self, event):
+        MONGODB_LATENCY.labels(event.command_name).observe(
+            event.duration_micros / 1e6
+        )
+
+
+async def monitor_event_loop_lag(interval: float = 0.5):
+    """Measure how late the event loop wakes up from a timed sleep"""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.set(max(0.0, loop.time() - started - interval))
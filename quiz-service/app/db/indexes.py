@@ -0,0 +1,135 @@
+import logging
+from typing import Dict, List
+
+from app.core.config import get_settings
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# MongoDB error codes raised when an index exists with different options
+INDEX_OPTIONS_CONFLICT = 85
+INDEX_KEY_SPECS_CONFLICT = 86
+
+# Expiry index of each collection that can have one: the date field it
+# expires on and the index name
+TTL_INDEXES = {
+    "sessions": ("start_time", "start_time_ttl"),
+    "answers": ("timestamp", "timestamp_ttl"),
+    "session_archives": ("archived_at", "archived_at_ttl"),
+    "session_stats": ("computed_at", "computed_at_ttl"),
+}
+
+
+def _retention_seconds(collection: str) -> int:
+    settings = get_settings()
+    if collection == "sessions":
+        days = settings.MONGODB_RETENTION_DAYS
+    else:
+        days = settings.MONGODB_RESULTS_RETENTION_DAYS
+    return days * 24 * 3600
+
+
+def get_index_definitions() -> Dict[str, List[IndexModel]]:
+    """Indexes every collection is expected to have, by collection name"""
+    indexes = {
+        "sessions": [IndexModel([("id", ASCENDING)], name="id_unique", unique=True)],
+        "answers": [
+            IndexModel(
+                [
+                    ("session_id", ASCENDING),
+                    ("question_id", ASCENDING),
+                    ("user_id", ASCENDING),
+                ],
+                name="session_question_user",
+            )
+        ],
+        "session_archives": [
+            IndexModel(
+                [("session_id", ASCENDING)], name="session_id_unique", unique=True
+            )
+        ],
+        "session_stats": [
+            IndexModel(
+                [("session_id", ASCENDING)], name="session_id_unique", unique=True
+            )
+        ],
+    }
+    for collection, (field, name) in TTL_INDEXES.items():
+        retention = _retention_seconds(collection)
+        if retention > 0:
+            indexes[collection].append(
+                IndexModel(
+                    [(field, ASCENDING)], name=name, expireAfterSeconds=retention
+                )
+            )
+    return indexes
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase):
+    """Create all declared indexes, safe to run on every startup"""
+    for collection, models in get_index_definitions().items():
+        for model in models:
+            spec = model.document
+            try:
+                await db[collection].create_indexes([model])
+            except OperationFailure as e:
+                if (
+                    e.code in (INDEX_OPTIONS_CONFLICT, INDEX_KEY_SPECS_CONFLICT)
+                    and "expireAfterSeconds" in spec
+                ):
+                    # Only the TTL changed, which collMod can update in place
+                    await db.command(
+                        "collMod",
+                        collection,
+                        index={
+                            "name": spec["name"],
+                            "expireAfterSeconds": spec["expireAfterSeconds"],
+                        },
+                    )
+                    logger.info("Updated TTL of index %s.%s", collection, spec["name"])
+                else:
+                    logger.error(
+                        "Failed to create index %s.%s: %s", collection, spec["name"], e
+                    )
+
+    # A TTL index left from an earlier configuration would keep deleting
+    for collection, (_, name) in TTL_INDEXES.items():
+        if _retention_seconds(collection) > 0:
+            continue
+        try:
+            if name in await db[collection].index_information():
+                await db[collection].drop_index(name)
+                logger.info(
+                    "Dropped TTL index %s.%s, retention is off", collection, name
+                )
+        except OperationFailure as e:
+            logger.error("Failed to drop index %s.%s: %s", collection, name, e)
+
+
+async def check_indexes(db: AsyncIOMotorDatabase) -> Dict[str, List[str]]:
+    """Report declared indexes that are missing and indexes never used.
+
+    Usage counts come from ``$indexStats`` and reset when mongod restarts,
+    so ``unused`` is only meaningful on a server that has seen traffic.
+    """
+    report = {"missing": [], "unused": []}
+    for collection, models in get_index_definitions().items():
+        existing = {}
+        async for stats in db[collection].aggregate([{"$indexStats": {}}]):
+            existing[stats["name"]] = stats["accesses"]["ops"]
+
+        # TTL deletions do not count as accesses, so never flag those as unused
+        ttl_indexes = set()
+        for model in models:
+            name = model.document["name"]
+            if "expireAfterSeconds" in model.document:
+                ttl_indexes.add(name)
+            if name not in existing:
+                report["missing"].append(f"{collection}.{name}")
+
+        for name, ops in existing.items():
+            if name != "_id_" and name not in ttl_indexes and ops == 0:
+                report["unused"].append(f"{collection}.{name}")
+    return report
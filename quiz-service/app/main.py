@@ -1,12 +1,13 @@
-import logging
+import asyncio
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from app.api.v1 import quiz
+from app.core.logging import setup_logging
+from app.core.metrics import monitor_event_loop_lag
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+setup_logging()
 
 
 app = FastAPI(
@@ -53,3 +54,18 @@ async def general_exception_handler(request: Request, exc: Exception):
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.on_event("startup")
+async def start_loop_lag_monitor():
+    app.state.loop_lag_monitor = asyncio.create_task(monitor_event_loop_lag())
+
+
+@app.on_event("shutdown")
+async def stop_loop_lag_monitor():
+    app.state.loop_lag_monitor.cancel()
+
+
+@app.get("/metrics")
+async def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
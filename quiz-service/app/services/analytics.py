@@ -0,0 +1,157 @@
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+SCORE_PERCENTILES = (10, 25, 50, 75, 90)
+TIME_PERCENTILES = (50, 90)
+
+
+def _epoch(value: datetime) -> float:
+    # MongoDB hands back naive datetimes in UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _round(value) -> float:
+    return round(float(value), 3)
+
+
+def _percentiles(
+    values: np.ndarray, percentiles: Sequence[int]
+) -> Dict[str, float]:
+    return {
+        f"p{p}": _round(value)
+        for p, value in zip(percentiles, np.percentile(values, percentiles))
+    }
+
+
+class AnswerColumns:
+    """A session's answers accumulated column by column.
+
+    Questions, options and users are stored as integer codes in compact
+    arrays, so a session's answers are scanned once and then aggregated
+    without per-answer Python work.
+    """
+
+    def __init__(self, questions: List[Dict], participants: Sequence[str] = ()):
+        self.question_ids = [question["id"] for question in questions]
+        self.question_codes = {qid: i for i, qid in enumerate(self.question_ids)}
+        self.options = [list(question["options"]) for question in questions]
+        # Options of all questions share one code space, offset per question
+        self.option_codes: Dict[tuple, int] = {}
+        self.option_count = 0
+        for q, options in enumerate(self.options):
+            for option in options:
+                self.option_codes.setdefault((q, option), self.option_count)
+                self.option_count += 1
+        self.user_codes: Dict[str, int] = {}
+        for user_id in participants:
+            self.user_codes.setdefault(user_id, len(self.user_codes))
+
+        self.question = array("i")
+        self.option = array("i")
+        self.user = array("i")
+        self.correct = array("b")
+        self.points = array("d")
+        self.timestamp = array("d")
+
+    def __len__(self) -> int:
+        return len(self.question)
+
+    def append(self, answer: Dict):
+        q = self.question_codes.get(answer["question_id"])
+        if q is None:
+            return
+        self.question.append(q)
+        self.option.append(self.option_codes.get((q, answer["answer"]), -1))
+        self.user.append(
+            self.user_codes.setdefault(answer["user_id"], len(self.user_codes))
+        )
+        self.correct.append(1 if answer.get("is_correct") else 0)
+        self.points.append(answer.get("points") or 0)
+        timestamp = answer.get("timestamp")
+        self.timestamp.append(_epoch(timestamp) if timestamp else np.nan)
+
+
+def summarize(
+    columns: AnswerColumns, question_started_at: Dict[int, datetime]
+) -> Dict:
+    """Per-question accuracy, option counts and answer times plus score
+    percentiles, computed with vectorized aggregations"""
+    question_count = len(columns.question_ids)
+    question = np.frombuffer(columns.question, dtype=np.int32)
+    option = np.frombuffer(columns.option, dtype=np.int32)
+    user = np.frombuffer(columns.user, dtype=np.int32)
+    correct = np.frombuffer(columns.correct, dtype=np.int8)
+    points = np.frombuffer(columns.points, dtype=np.float64)
+    timestamp = np.frombuffer(columns.timestamp, dtype=np.float64)
+
+    answers = np.bincount(question, minlength=question_count)
+    corrects = np.bincount(question, weights=correct, minlength=question_count)
+    option_counts = np.bincount(
+        option[option >= 0], minlength=columns.option_count
+    )
+
+    started = np.full(question_count, np.nan)
+    for index, value in question_started_at.items():
+        if 0 <= index < question_count:
+            started[index] = _epoch(value)
+    elapsed = timestamp - started[question]
+
+    # Group answer times by question with one sort instead of a scan each
+    order = np.argsort(question, kind="stable")
+    groups = np.split(elapsed[order], np.cumsum(answers)[:-1])
+
+    questions = []
+    offset = 0
+    for q, question_id in enumerate(columns.question_ids):
+        options = columns.options[q]
+        counts = option_counts[offset : offset + len(options)]
+        offset += len(options)
+
+        times = groups[q][~np.isnan(groups[q])]
+        time_to_answer = None
+        if times.size:
+            time_to_answer = {
+                "mean": _round(times.mean()),
+                "max": _round(times.max()),
+                **_percentiles(times, TIME_PERCENTILES),
+            }
+
+        distribution: Dict[str, int] = {}
+        for option_name, count in zip(options, counts):
+            # A repeated option keeps the code of its first occurrence
+            distribution.setdefault(option_name, int(count))
+
+        total = int(answers[q])
+        questions.append(
+            {
+                "question_id": question_id,
+                "answers": total,
+                "correct": int(corrects[q]),
+                "accuracy": _round(corrects[q] / total) if total else None,
+                "distribution": distribution,
+                "other": total - int(counts.sum()),
+                "time_to_answer": time_to_answer,
+            }
+        )
+
+    totals = np.bincount(user, weights=points, minlength=len(columns.user_codes))
+    scores: Optional[Dict] = None
+    if totals.size:
+        scores = {
+            "mean": _round(totals.mean()),
+            "min": _round(totals.min()),
+            "max": _round(totals.max()),
+            **_percentiles(totals, SCORE_PERCENTILES),
+        }
+
+    return {
+        "answers": len(columns),
+        "participants": len(columns.user_codes),
+        "questions": questions,
+        "scores": scores,
+    }
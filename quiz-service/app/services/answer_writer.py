@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+from app.core.metrics import ANSWER_FLUSH_LATENCY
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import (
+    BulkWriteError,
+    ConnectionFailure,
+    ExecutionTimeout,
+    WTimeoutError,
+)
+
+logger = logging.getLogger(__name__)
+
+# Queued by ``stop`` to tell the background writer to exit after draining
+_STOP = object()
+
+# Errors after which the same batch can be written again once MongoDB recovers
+TRANSIENT_ERRORS = (ConnectionFailure, ExecutionTimeout, WTimeoutError)
+
+DUPLICATE_KEY = 11000
+
+
+class AnswerWriter:
+    """Write-behind buffer persisting answer documents with batched inserts.
+
+    Documents are queued in memory and written with ``insert_many`` once
+    ``batch_size`` documents are pending or ``flush_interval`` seconds have
+    passed. The queue is bounded, so when MongoDB falls behind ``put`` blocks
+    the caller instead of growing memory without limit.
+
+    Answers are scored before they are persisted, so a batch that fails
+    with a transient error is retried with exponential backoff rather than
+    dropped; meanwhile the queue fills up and pushes back on submitters.
+    Only once ``stop`` was called does a transient failure give up.
+    """
+
+    def __init__(
+        self,
+        collection: AsyncIOMotorCollection,
+        max_queue_size: int = 50000,
+        batch_size: int = 1000,
+        flush_interval: float = 0.2,
+        retry_backoff: float = 0.1,
+        max_retry_backoff: float = 5.0,
+    ):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self._stopping = False
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        # Batch the background writer is still collecting, visible to flush
+        self._collecting: List[Dict] = []
+        self._flush_lock = asyncio.Lock()
+        self._written = 0
+        self._failed = 0
+        self._flushes = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> Dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "written": self._written,
+            "failed": self._failed,
+            "flushes": self._flushes,
+            "last_flush_ms": self._last_flush_ms,
+            "max_flush_ms": self._max_flush_ms,
+        }
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def put(self, document: Dict):
+        """Queue a document, waiting for room when the buffer is full"""
+        await self._queue.put(document)
+
+    async def flush(self):
+        """Write everything buffered so far and wait for in-flight writes"""
+        batch, self._collecting = self._collecting, []
+        stopping = False
+        while not self._queue.empty():
+            document = self._queue.get_nowait()
+            if document is _STOP:
+                stopping = True
+                continue
+            batch.append(document)
+            if len(batch) >= self.batch_size:
+                await self._write(batch)
+                batch = []
+        if batch:
+            await self._write(batch)
+        if stopping:
+            self._queue.put_nowait(_STOP)
+        # Writes hold the lock, so once we get it the background batch is done
+        async with self._flush_lock:
+            pass
+
+    async def stop(self):
+        """Stop the background writer and flush remaining documents"""
+        self._stopping = True
+        if self._task is not None:
+            await self._queue.put(_STOP)
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            document = await self._queue.get()
+            if document is _STOP:
+                return
+
+            self._collecting = [document]
+            stopping = False
+            deadline = loop.time() + self.flush_interval
+            try:
+                while len(self._collecting) < self.batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    document = await asyncio.wait_for(self._queue.get(), timeout)
+                    if document is _STOP:
+                        stopping = True
+                        break
+                    self._collecting.append(document)
+            except asyncio.TimeoutError:
+                pass
+
+            batch, self._collecting = self._collecting, []
+            if batch:
+                await self._write(batch)
+            if stopping:
+                return
+
+    async def _write(self, batch: List[Dict]):
+        async with self._flush_lock:
+            started = time.perf_counter()
+            try:
+                await self._insert(batch)
+            finally:
+                elapsed = time.perf_counter() - started
+                ANSWER_FLUSH_LATENCY.observe(elapsed)
+                self._flushes += 1
+                self._last_flush_ms = elapsed * 1000
+                self._max_flush_ms = max(self._max_flush_ms, elapsed * 1000)
+
+    async def _insert(self, batch: List[Dict]):
+        backoff = self.retry_backoff
+        while True:
+            try:
+                await self.collection.insert_many(batch, ordered=False)
+                self._written += len(batch)
+                return
+            except BulkWriteError as e:
+                # insert_many assigned the _ids, so documents an interrupted
+                # earlier attempt already wrote come back as duplicates
+                failed = sum(
+                    1
+                    for error in e.details.get("writeErrors", [])
+                    if error.get("code") != DUPLICATE_KEY
+                )
+                self._written += len(batch) - failed
+                self._failed += failed
+                if failed:
+                    logger.error(
+                        "Failed to persist %s of %s answers", failed, len(batch)
+                    )
+                return
+            except TRANSIENT_ERRORS as e:
+                if self._stopping:
+                    self._failed += len(batch)
+                    logger.error("Gave up persisting %s answers: %s", len(batch), e)
+                    return
+                logger.warning(
+                    "Retrying %s answers in %.1fs: %s", len(batch), backoff, e
+                )
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_retry_backoff)
+            except Exception as e:
+                self._failed += len(batch)
+                logger.error("Error persisting %s answers: %s", len(batch), e)
+                return
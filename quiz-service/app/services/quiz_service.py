@@ -1,40 +1,205 @@
 import asyncio
+import csv
+import io
+import json
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Set, Tuple
 
 from app.core.config import get_settings
+from app.core.metrics import InstrumentedRedis, MongoCommandMetrics, timed
+from app.db.indexes import check_indexes, ensure_indexes
 from app.models.quiz import Answer, Quiz, QuizSession
+from app.services import session_actor
+from app.services.analytics import AnswerColumns, summarize
+from app.services.answer_writer import AnswerWriter
+from app.services.scheduler import QuestionScheduler
+from app.services.session_actor import CommandRejected, SessionActor, SessionActors
+from app.utils.cache import TTLCache
+from app.utils.ndjson import iter_lines
+from app.utils.redis_utils import SessionStore, leaderboard_key
+from app.websockets.broadcasters import (
+    DistributionBroadcaster,
+    LeaderboardBroadcaster,
+    RosterDeltaBatcher,
+)
+from app.websockets.codec import EncodedMessage, MessageTemplate
 from app.websockets.manager import manager
 from bson import ObjectId
 from fastapi import HTTPException, WebSocket
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from redis.asyncio import Redis
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError, OperationFailure
 
 logger = logging.getLogger(__name__)
 
+# MongoDB error code for commands the user lacks the privileges for
+UNAUTHORIZED = 13
+
+
+class AnswerKeyEntry(NamedTuple):
+    correct_answer: str
+    points: int
+    time_limit: int
+    options: Tuple[str, ...]
+
+
+class CachedQuiz(NamedTuple):
+    quiz: Quiz
+    answer_key: Dict[str, AnswerKeyEntry]
+
+
+class SessionArchive(NamedTuple):
+    document: Dict
+    # user id -> index in the archived standings
+    positions: Dict[str, int]
+
+
+# Columns of CSV exports, answer rows and standing rows share one header
+EXPORT_FIELDS = [
+    "record",
+    "user_id",
+    "question_id",
+    "answer",
+    "is_correct",
+    "points",
+    "timestamp",
+    "rank",
+    "score",
+]
+
+# What a cached session_state template depends on: status and question index
+SnapshotVersion = Tuple[str, int]
+
+
+def _quiz_document(quiz: Quiz) -> Dict:
+    """MongoDB document for a new quiz, shared by create and import"""
+    quiz_dict = quiz.model_dump(exclude={"_id"} if quiz.id is None else set())
+    quiz_dict["created_at"] = datetime.utcnow()
+    quiz_dict["updated_at"] = datetime.utcnow()
+
+    for question in quiz_dict["questions"]:
+        if "id" not in question:
+            question["id"] = str(ObjectId())
+    return quiz_dict
+
+
+def _load_archive(stored: Dict) -> SessionArchive:
+    """Expand a stored archive into the ranked entries readers expect.
+
+    Archives are stored with standings as parallel ``user_ids`` and
+    ``scores`` arrays and only the participants without a score listed
+    separately, which keeps large sessions well below the BSON size limit.
+    """
+    document = {
+        key: value
+        for key, value in stored.items()
+        if key not in ("_id", "standings", "unranked_participants")
+    }
+    standings = stored["standings"]
+    if isinstance(standings, dict):
+        user_ids = standings["user_ids"]
+        standings = [
+            {"user_id": user_id, "rank": i + 1, "score": score}
+            for i, (user_id, score) in enumerate(zip(user_ids, standings["scores"]))
+        ]
+        document["participants"] = sorted(
+            [*user_ids, *stored.get("unranked_participants", [])]
+        )
+    document["standings"] = standings
+    return SessionArchive(
+        document, {entry["user_id"]: i for i, entry in enumerate(standings)}
+    )
+
+
+def _session_state(session_id: str, state: Dict) -> Dict:
+    return {
+        "type": "session_state",
+        "session_id": session_id,
+        "status": state["status"],
+        "current_question": state.get("current_question", 0),
+        "total_questions": len(state["questions"]),
+        "questions": state["questions"],
+    }
+
 
 class QuizService:
     def __init__(self):
         self.settings = get_settings()
-        self.redis: Redis = None
+        self.redis: InstrumentedRedis = None
         self.mongodb: AsyncIOMotorClient = None
         self.db: AsyncIOMotorDatabase = None
+        self.sessions: SessionStore = None
+        self.answer_writer: AnswerWriter = None
+        # Only set in SESSION_ACTOR_MODE
+        self.actors: Optional[SessionActors] = None
+        self.scheduler = QuestionScheduler(
+            self.advance_question,
+            tick=self.settings.SCHEDULER_TICK_MS / 1000,
+            lease_grace=self.settings.SCHEDULER_LEASE_GRACE_MS / 1000,
+            sweep_interval=self.settings.SCHEDULER_SWEEP_INTERVAL_MS / 1000,
+        )
+        self.quiz_cache = TTLCache(
+            maxsize=self.settings.QUIZ_CACHE_SIZE,
+            ttl=self.settings.QUIZ_CACHE_TTL_SECONDS,
+            name="quiz",
+        )
+        # A session's quiz never changes, so this mapping needs no invalidation
+        self.session_quiz_ids = TTLCache(
+            maxsize=self.settings.QUIZ_CACHE_SIZE * 16,
+            ttl=self.settings.SESSION_TTL_SECONDS,
+            name="session_quiz_id",
+        )
+        # Archives never change once written
+        self.archives = TTLCache(
+            maxsize=self.settings.ARCHIVE_CACHE_SIZE,
+            ttl=self.settings.QUIZ_CACHE_TTL_SECONDS,
+            name="archive",
+        )
+        self.session_stats = TTLCache(
+            maxsize=self.settings.QUIZ_CACHE_SIZE,
+            ttl=self.settings.QUIZ_CACHE_TTL_SECONDS,
+            name="session_stats",
+        )
+        self._stats_tasks: Set[asyncio.Task] = set()
+        # session id -> (version, session_state template without the roster)
+        self.session_snapshots = TTLCache(
+            maxsize=self.settings.SESSION_SNAPSHOT_CACHE_SIZE,
+            ttl=self.settings.SESSION_SNAPSHOT_TTL_SECONDS,
+            name="session_snapshot",
+        )
+        self._snapshot_builds: Dict[Tuple[str, SnapshotVersion], asyncio.Future] = {}
+        self.leaderboard_broadcaster = LeaderboardBroadcaster(
+            self.get_leaderboard,
+            interval=self.settings.LEADERBOARD_BROADCAST_INTERVAL_MS / 1000,
+            limit=self.settings.LEADERBOARD_BROADCAST_SIZE,
+            deltas=self.settings.LEADERBOARD_BROADCAST_DELTAS,
+        )
+        self.roster_batcher = RosterDeltaBatcher(
+            interval=self.settings.ROSTER_DELTA_INTERVAL_MS / 1000
+        )
+        self.distribution_broadcaster = DistributionBroadcaster(
+            self.get_answer_distribution,
+            interval=self.settings.ANSWER_DISTRIBUTION_BROADCAST_INTERVAL_MS / 1000,
+        )
 
     async def setup(self):
         try:
             retries = 5
             while retries > 0:
                 try:
-                    self.redis = Redis.from_url(
+                    self.redis = InstrumentedRedis.from_url(
                         self.settings.REDIS_URL,
                         decode_responses=True,
                         retry_on_timeout=True,
                     )
                     await self.redis.ping()
+                    self.sessions = SessionStore(
+                        self.redis, ttl=self.settings.SESSION_TTL_SECONDS
+                    )
 
                     logger.info(
-                        f"Connecting to MongoDB at: {self.settings.MONGODB_URL}"
+                        "Connecting to MongoDB at: %s", self.settings.MONGODB_URL
                     )
                     self.mongodb = AsyncIOMotorClient(
                         self.settings.MONGODB_URL,
@@ -42,55 +207,132 @@ class QuizService:
                         connectTimeoutMS=5000,
                         retryWrites=True,
                         retryReads=True,
+                        event_listeners=[MongoCommandMetrics()],
                     )
 
                     await self.mongodb.admin.command("ping")
                     self.db = self.mongodb[self.settings.MONGODB_DB]
                     await self.setup_collections()
 
+                    self.answer_writer = AnswerWriter(
+                        self.db.answers,
+                        max_queue_size=self.settings.ANSWER_BUFFER_MAX_SIZE,
+                        batch_size=self.settings.ANSWER_BUFFER_BATCH_SIZE,
+                        flush_interval=self.settings.ANSWER_BUFFER_FLUSH_INTERVAL_MS
+                        / 1000,
+                        retry_backoff=self.settings.ANSWER_WRITE_RETRY_BACKOFF_MS / 1000,
+                        max_retry_backoff=(
+                            self.settings.ANSWER_WRITE_RETRY_MAX_BACKOFF_MS / 1000
+                        ),
+                    )
+                    self.answer_writer.start()
+                    if self.settings.SESSION_ACTOR_MODE:
+                        self.actors = SessionActors(
+                            self.sessions,
+                            self.db.sessions,
+                            batch_size=self.settings.SESSION_ACTOR_BATCH_SIZE,
+                            idle_timeout=self.settings.SESSION_ACTOR_IDLE_SECONDS,
+                        )
+                    self.leaderboard_broadcaster.start()
+                    self.roster_batcher.start()
+                    if self.settings.ANSWER_DISTRIBUTION_BROADCAST:
+                        self.distribution_broadcaster.start()
+                    self.scheduler.start(self.redis)
+
+                    if self.settings.REDIS_MIGRATE_LEGACY_SESSIONS:
+                        migrated = await self.sessions.migrate_all_legacy()
+                        if migrated:
+                            logger.info("Migrated %s legacy Redis sessions", migrated)
+
                     logger.info("Successfully connected to MongoDB and Redis")
                     break
 
                 except Exception as e:
                     retries -= 1
                     if retries == 0:
-                        logger.error(f"Failed to connect after all retries: {str(e)}")
+                        logger.error("Failed to connect after all retries: %s", e)
                         raise
                     logger.warning(
-                        f"Failed to connect to databases, retrying... ({retries} attempts left)"
+                        "Failed to connect to databases, retrying... (%s attempts left)",
+                        retries,
                     )
                     await asyncio.sleep(5)
 
         except Exception as e:
-            logger.error(f"Failed to setup database connections: {str(e)}")
+            logger.error("Failed to setup database connections: %s", e)
             raise
 
     async def cleanup(self):
         """Cleanup database connections"""
         try:
+            await self.scheduler.stop()
+            await self.leaderboard_broadcaster.stop()
+            await self.roster_batcher.stop()
+            await self.distribution_broadcaster.stop()
+            if self.actors is not None:
+                await self.actors.stop()
+            if self._stats_tasks:
+                await asyncio.gather(*self._stats_tasks, return_exceptions=True)
+            if self.answer_writer is not None:
+                await self.answer_writer.stop()
             if self.redis is not None:
                 await self.redis.close()
             if self.mongodb is not None:
                 self.mongodb.close()
             logger.info("Database connections closed")
         except Exception as e:
-            logger.error(f"Error during cleanup: {str(e)}")
+            logger.error("Error during cleanup: %s", e)
 
     async def setup_collections(self):
         """Ensure all required collections exist"""
         try:
             collections = await self.db.list_collection_names()
-            required_collections = ["quizzes", "sessions", "answers"]
+            required_collections = [
+                "quizzes",
+                "sessions",
+                "answers",
+                "session_archives",
+                "session_stats",
+            ]
 
             for collection in required_collections:
                 if collection not in collections:
                     await self.db.create_collection(collection)
-                    logger.info(f"Created collection: {collection}")
+                    logger.info("Created collection: %s", collection)
+
+            await ensure_indexes(self.db)
+
+            try:
+                report = await self.check_indexes()
+                if report["missing"]:
+                    logger.warning("Missing MongoDB indexes: %s", report["missing"])
+            except Exception as e:
+                # $indexStats needs extra privileges, never fail startup on it
+                logger.warning("Could not check MongoDB indexes: %s", e)
 
         except Exception as e:
-            logger.error(f"Error setting up collections: {str(e)}")
+            logger.error("Error setting up collections: %s", e)
             raise
 
+    async def check_indexes(self) -> Dict[str, List[str]]:
+        """Report missing and unused MongoDB indexes"""
+        try:
+            return await check_indexes(self.db)
+        except OperationFailure as e:
+            logger.error("Error checking indexes: %s", e)
+            if e.code == UNAUTHORIZED:
+                raise HTTPException(
+                    status_code=403,
+                    detail="Index report needs the indexStats privilege "
+                    "(e.g. the clusterMonitor role) on the quiz database",
+                )
+            reason = (e.details or {}).get("errmsg") or str(e)
+            raise HTTPException(
+                status_code=503,
+                detail=f"Index usage statistics are unavailable: {reason}",
+            )
+
+    @timed("create_quiz")
     async def create_quiz(self, quiz: Quiz) -> Quiz:
         """Create a new quiz"""
         try:
@@ -99,26 +341,116 @@ class QuizService:
                     status_code=500, detail="Database connection not initialized"
                 )
 
-            quiz_dict = quiz.model_dump(exclude={"_id"} if quiz.id is None else set())
-            quiz_dict["created_at"] = datetime.utcnow()
-            quiz_dict["updated_at"] = datetime.utcnow()
-
-            for question in quiz_dict["questions"]:
-                if "id" not in question:
-                    question["id"] = str(ObjectId())
-
-            result = await self.db.quizzes.insert_one(quiz_dict)
+            result = await self.db.quizzes.insert_one(_quiz_document(quiz))
             quiz.id = str(result.inserted_id)
             return quiz
 
         except Exception as e:
-            logger.error(f"Error creating quiz: {str(e)}")
+            logger.error("Error creating quiz: %s", e)
             raise HTTPException(
                 status_code=500, detail=f"Failed to create quiz: {str(e)}"
             )
 
+    @timed("import_quizzes")
+    async def import_quizzes(self, chunks: AsyncIterator[bytes]) -> Dict:
+        """Import quizzes from a streamed NDJSON body, one quiz per line.
+
+        Lines are validated as they arrive and inserted in batches, so memory
+        stays bounded by the batch size and the longest accepted line.
+        """
+        if self.db is None:
+            raise HTTPException(
+                status_code=500, detail="Database connection not initialized"
+            )
+
+        report = {"imported": 0, "failed": 0, "errors": [], "errors_truncated": False}
+
+        def record_error(line_number: int, error: str):
+            report["failed"] += 1
+            if len(report["errors"]) < self.settings.QUIZ_IMPORT_MAX_ERRORS:
+                report["errors"].append({"line": line_number, "error": error})
+            else:
+                report["errors_truncated"] = True
+
+        async def insert(batch: List[Tuple[int, Dict]]):
+            try:
+                result = await self.db.quizzes.insert_many(
+                    [document for _, document in batch], ordered=False
+                )
+                report["imported"] += len(result.inserted_ids)
+            except BulkWriteError as e:
+                report["imported"] += e.details.get("nInserted", 0)
+                for error in e.details.get("writeErrors", []):
+                    record_error(batch[error["index"]][0], error["errmsg"])
+
+        batch: List[Tuple[int, Dict]] = []
+        max_line_bytes = self.settings.QUIZ_IMPORT_MAX_LINE_BYTES
+        async for line_number, line in iter_lines(chunks, max_line_bytes):
+            if line is None:
+                record_error(line_number, f"Line exceeds {max_line_bytes} bytes")
+                continue
+            try:
+                quiz = Quiz.model_validate_json(line)
+            except ValidationError as e:
+                record_error(line_number, str(e))
+                continue
+
+            batch.append((line_number, _quiz_document(quiz)))
+            if len(batch) >= self.settings.QUIZ_IMPORT_BATCH_SIZE:
+                await insert(batch)
+                batch = []
+
+        if batch:
+            await insert(batch)
+
+        logger.info(
+            "Imported %s quizzes, %s lines failed", report["imported"], report["failed"]
+        )
+        return report
+
+    @timed("get_quiz")
     async def get_quiz(self, quiz_id: str) -> Optional[Quiz]:
         """Get quiz details"""
+        cached = await self.get_cached_quiz(quiz_id)
+        return cached.quiz if cached else None
+
+    async def get_answer_key(self, quiz_id: str) -> Optional[Dict[str, AnswerKeyEntry]]:
+        """Get the compiled ``question_id -> AnswerKeyEntry`` map of a quiz"""
+        cached = await self.get_cached_quiz(quiz_id)
+        return cached.answer_key if cached else None
+
+    def invalidate_quiz(self, quiz_id: str):
+        """Drop a quiz and its answer key, call whenever a quiz is modified"""
+        self.quiz_cache.invalidate(quiz_id)
+
+    def invalidate_session(self, session_id: str):
+        """Drop a session's cached quiz id and session_state snapshot"""
+        self.session_quiz_ids.invalidate(session_id)
+        self.session_snapshots.invalidate(session_id)
+
+    async def get_cached_quiz(self, quiz_id: str) -> Optional[CachedQuiz]:
+        """Get a quiz and its answer key, loading it on a cache miss"""
+        cached = self.quiz_cache.get(quiz_id)
+        if cached is not None:
+            return cached
+
+        quiz = await self._load_quiz(quiz_id)
+        if quiz is None:
+            return None
+
+        cached = CachedQuiz(
+            quiz=quiz,
+            answer_key={
+                q.id: AnswerKeyEntry(
+                    q.correct_answer, q.points, q.time_limit, tuple(q.options)
+                )
+                for q in quiz.questions
+            },
+        )
+        self.quiz_cache.set(quiz_id, cached)
+        return cached
+
+    async def _load_quiz(self, quiz_id: str) -> Optional[Quiz]:
         try:
             if self.db is None:
                 raise HTTPException(
@@ -140,9 +472,10 @@ class QuizService:
         except HTTPException:
             raise
         except Exception as e:
-            logger.error(f"Error getting quiz: {str(e)}")
+            logger.error("Error getting quiz: %s", e)
             raise HTTPException(status_code=500, detail=f"Failed to get quiz: {str(e)}")
 
+    @timed("create_session")
     async def create_session(self, quiz_id: str) -> QuizSession:
         """Create a new quiz session"""
         try:
@@ -156,7 +489,8 @@ class QuizService:
                 raise HTTPException(status_code=404, detail="Quiz not found")
 
             session = QuizSession(
-                id=f"session_{quiz_id}_{int(datetime.utcnow().timestamp())}",
+                # Unique even for sessions of one quiz created in the same second
+                id=f"session_{quiz_id}_{ObjectId()}",
                 quiz_id=quiz_id,
                 start_time=datetime.utcnow(),
                 status="waiting",
@@ -165,25 +499,23 @@ class QuizService:
                 participants=[],
             )
 
-            await self.redis.setex(
-                f"quiz_session:{session.id}",
-                3600,  # 1 hour expiry
-                session.model_dump_json(),
-            )
-
+            # MongoDB enforces unique ids, so write it first: a failed insert
+            # must not overwrite the Redis state of an existing session
             await self.db.sessions.insert_one(session.model_dump())
+            await self.sessions.save(session)
 
-            logger.info(f"Created quiz session: {session.id}")
+            logger.info("Created quiz session: %s", session.id)
             return session
 
         except HTTPException:
             raise
         except Exception as e:
-            logger.error(f"Error creating quiz session: {str(e)}")
+            logger.error("Error creating quiz session: %s", e)
             raise HTTPException(
                 status_code=500, detail=f"Failed to create quiz session: {str(e)}"
             )
 
+    @timed("get_leaderboard")
     async def get_leaderboard(self, session_id: str, limit: int = 10) -> List[Dict]:
         """Get session leaderboard"""
         try:
@@ -193,19 +525,115 @@ class QuizService:
                 )
 
             scores = await self.redis.zrevrange(
-                f"leaderboard:{session_id}", 0, limit - 1, withscores=True
+                leaderboard_key(session_id), 0, limit - 1, withscores=True
             )
+            if not scores:
+                archive = await self.get_archive(session_id)
+                if archive is not None:
+                    return [
+                        {"user_id": entry["user_id"], "score": entry["score"]}
+                        for entry in archive.document["standings"][:limit]
+                    ]
 
             return [
                 {"user_id": user_id, "score": int(score)} for user_id, score in scores
             ]
 
         except Exception as e:
-            logger.error(f"Error getting leaderboard: {str(e)}")
+            logger.error("Error getting leaderboard: %s", e)
             raise HTTPException(
                 status_code=500, detail=f"Failed to get leaderboard: {str(e)}"
             )
 
+    @timed("get_ranks")
+    async def get_ranks(self, session_id: str, user_ids: List[str]) -> Dict:
+        """Ranks of several users in one round trip"""
+        if len(user_ids) > self.settings.LEADERBOARD_MAX_BATCH:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {self.settings.LEADERBOARD_MAX_BATCH} users per call",
+            )
+        try:
+            ranks = await self.sessions.get_ranks(session_id, user_ids)
+            if all(entry["rank"] is None for entry in ranks):
+                archive = await self.get_archive(session_id)
+                if archive is not None:
+                    standings = archive.document["standings"]
+                    for entry in ranks:
+                        position = archive.positions.get(entry["user_id"])
+                        if position is not None:
+                            entry.update(standings[position])
+            return {"session_id": session_id, "ranks": ranks}
+        except Exception as e:
+            logger.error("Error getting ranks: %s", e)
+            raise HTTPException(status_code=500, detail="Failed to get ranks")
+
+    @timed("get_rank_window")
+    async def get_rank_window(
+        self, session_id: str, user_id: str, radius: int = 5
+    ) -> Dict:
+        """A user's rank together with the players ranked around them"""
+        radius = min(radius, self.settings.LEADERBOARD_MAX_BATCH // 2)
+        try:
+            (own,) = (await self.get_ranks(session_id, [user_id]))["ranks"]
+            if own["rank"] is None:
+                raise HTTPException(status_code=404, detail="User has no score")
+
+            offset = max(0, own["rank"] - 1 - radius)
+            entries, total = await self._leaderboard_range(
+                session_id, offset, own["rank"] - offset + radius
+            )
+            return {
+                "session_id": session_id,
+                "user": own,
+                "entries": entries,
+                "total": total,
+            }
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error("Error getting rank window: %s", e)
+            raise HTTPException(status_code=500, detail="Failed to get rank window")
+
+    async def _leaderboard_range(
+        self, session_id: str, offset: int, count: int
+    ) -> Tuple[List[Dict], int]:
+        entries, total = await self.sessions.get_leaderboard_range(
+            session_id, offset, count
+        )
+        if total == 0:
+            archive = await self.get_archive(session_id)
+            if archive is not None:
+                standings = archive.document["standings"]
+                return standings[offset : offset + count], len(standings)
+        return entries, total
+
+    @timed("get_leaderboard_page")
+    async def get_leaderboard_page(
+        self, session_id: str, cursor: int = 0, limit: int = 100
+    ) -> Dict:
+        """One page of the ranked leaderboard.
+
+        The cursor is the offset of the next page; scores that change while
+        paging shift players between pages.
+        """
+        limit = max(1, min(limit, self.settings.LEADERBOARD_MAX_BATCH))
+        try:
+            entries, total = await self._leaderboard_range(session_id, cursor, limit)
+            next_cursor = cursor + len(entries)
+            return {
+                "session_id": session_id,
+                "entries": entries,
+                "total": total,
+                "next_cursor": next_cursor if next_cursor < total else None,
+            }
+        except Exception as e:
+            logger.error("Error getting leaderboard page: %s", e)
+            raise HTTPException(
+                status_code=500, detail="Failed to get leaderboard page"
+            )
+
+    @timed("start_session")
     async def start_session(self, session_id: str):
         """Start a quiz session"""
         try:
@@ -226,23 +654,39 @@ class QuizService:
             if not session.questions:
                 raise HTTPException(status_code=400, detail="Session has no questions")
 
-            await self.db.sessions.update_one(
-                {"id": session_id},
-                {
-                    "$set": {
-                        "status": "active",
-                        "current_question": 0,
-                        "updated_at": datetime.utcnow(),
-                    }
-                },
-            )
+            actor = await self._actor(session_id)
+            if actor is not None:
+                # Re-checked by the actor, so concurrent starts cannot both win
+                try:
+                    await actor.execute(session_actor.start_session())
+                except CommandRejected as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+                session.status = "active"
+                session.current_question = 0
+                session.updated_at = datetime.utcnow()
+            else:
+                await self.db.sessions.update_one(
+                    {"id": session_id},
+                    {
+                        "$set": {
+                            "status": "active",
+                            "current_question": 0,
+                            "question_started_at.0": datetime.utcnow(),
+                            "updated_at": datetime.utcnow(),
+                        }
+                    },
+                )
 
-            session.status = "active"
-            session.current_question = 0
-            session_key = f"quiz_session:{session_id}"
-            await self.redis.set(
-                session_key, session.model_dump_json(), ex=3600  # 1 hour expiry
-            )
+                session.status = "active"
+                session.current_question = 0
+                session.updated_at = datetime.utcnow()
+                await self.sessions.update_header(
+                    session_id,
+                    status=session.status,
+                    current_question=session.current_question,
+                    current_question_id=session.questions[0].id,
+                    updated_at=session.updated_at,
+                )
 
             current_question = session.questions[0]
 
@@ -259,221 +703,769 @@ class QuizService:
                 },
             )
 
+            await self.scheduler.schedule(session_id, current_question.time_limit)
+
             logger.info(
-                f"Started session {session_id} with {len(session.participants)} participants"
+                "Started session %s with %s participants",
+                session_id,
+                len(session.participants),
             )
             return session
 
         except HTTPException:
             raise
         except Exception as e:
-            logger.error(f"Error starting session: {str(e)}")
+            logger.error("Error starting session: %s", e)
             raise HTTPException(
                 status_code=500, detail=f"Failed to start session: {str(e)}"
             )
 
-    async def submit_answer(self, answer: Answer) -> Dict:
-        try:
-            session_data = await self.redis.get(f"quiz_session:{answer.session_id}")
-            if not session_data:
-                raise HTTPException(status_code=404, detail="Session not found")
+    @timed("advance_question")
+    async def advance_question(self, session_id: str) -> Optional[float]:
+        """Close the current question and move on to the next one.
+
+        Called by the scheduler when the current question's time limit runs
+        out. Returns the time limit of the new question, or None when the
+        session is over.
+        """
+        header = await self._get_header(session_id)
+        if header is not None and header.get("status") == "completed":
+            # Live keys outlive completion only when finishing it failed
+            await self.finish_session(session_id)
+            return None
+        if header is None or header.get("status") != "active":
+            return None
+
+        index = header["current_question"] + 1
+        if index >= header["total_questions"]:
+            await self.complete_session(session_id)
+            return None
+
+        question = await self.sessions.get_question(session_id, index)
+        now = datetime.utcnow()
+        await self._update_session(
+            session_id,
+            {
+                "current_question": index,
+                # Keyed by index, question ids may contain dots
+                f"question_started_at.{index}": now,
+                "updated_at": now,
+            },
+            current_question=index,
+            current_question_id=question.id,
+            updated_at=now,
+        )
+
+        await manager.broadcast_to_session(
+            session_id,
+            {
+                "type": "next_question",
+                "session_id": session_id,
+                "question": question.model_dump(),
+                "question_number": index + 1,
+                "total_questions": header["total_questions"],
+            },
+        )
+        return question.time_limit
+
+    @timed("complete_session")
+    async def complete_session(self, session_id: str):
+        """Mark a session completed, then archive it and free its Redis keys"""
+        now = datetime.utcnow()
+        await self._update_session(
+            session_id,
+            {"status": "completed", "end_time": now, "updated_at": now},
+            status="completed",
+            current_question_id=None,
+            end_time=now,
+            updated_at=now,
+        )
+
+        self.leaderboard_broadcaster.forget(session_id)
+        await self.finish_session(session_id)
+
+    async def finish_session(self, session_id: str):
+        """Archive a completed session, announce its results and free its
+        Redis keys.
+
+        If archiving fails this raises with the live keys still in place,
+        so the scheduler keeps the deadline and retries through
+        advance_question until the archive is written.
+        """
+        archive = await self.archive_session(session_id)
+        await manager.broadcast_to_session(
+            session_id,
+            {
+                "type": "quiz_completed",
+                "session_id": session_id,
+                "final_leaderboard": [
+                    {"user_id": entry["user_id"], "score": entry["score"]}
+                    for entry in archive["standings"][
+                        : self.settings.LEADERBOARD_BROADCAST_SIZE
+                    ]
+                ],
+            },
+        )
 
-            session = QuizSession.model_validate_json(session_data)
-            current_question = session.questions[session.current_question]
+        try:
+            await self.sessions.purge(
+                session_id,
+                [question["id"] for question in archive["questions"]],
+                [entry["user_id"] for entry in archive["standings"]],
+            )
+            self.invalidate_session(session_id)
+            if self.actors is not None:
+                await self.actors.drop(session_id)
+        except Exception as e:
+            # Every key carries a TTL, so a failed purge only delays reclaiming
+            logger.error("Error purging Redis keys of session %s: %s", session_id, e)
+
+        if self.settings.SESSION_STATS_PRECOMPUTE:
+            task = asyncio.create_task(self._precompute_stats(session_id))
+            self._stats_tasks.add(task)
+            task.add_done_callback(self._stats_tasks.discard)
+        logger.info("Completed session %s", session_id)
+
+    async def _actor(self, session_id: str) -> Optional[SessionActor]:
+        """The session's actor in actor mode, None otherwise or when the
+        session is not live in Redis"""
+        if self.actors is None:
+            return None
+        return await self.actors.get(session_id)
+
+    async def _get_header(self, session_id: str) -> Optional[Dict]:
+        """Session header, served from memory when the session has an actor"""
+        actor = await self._actor(session_id)
+        if actor is not None:
+            return dict(actor.header)
+        return await self.sessions.get_header(session_id)
+
+    async def _update_session(self, session_id: str, mongo_set: Dict, **fields):
+        """Set header fields in Redis and the matching fields in MongoDB"""
+        actor = await self._actor(session_id)
+        if actor is not None:
+            await actor.execute(session_actor.update_session(mongo_set, **fields))
+            return
+        await self.sessions.update_header(session_id, **fields)
+        await self.db.sessions.update_one({"id": session_id}, {"$set": mongo_set})
+
+    async def archive_session(self, session_id: str) -> Dict:
+        """Write the final standings and summary of a session to one document"""
+        state = await self.sessions.read_state(session_id)
+        if state is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+
+        standings = await self.sessions.get_standings(session_id)
+        ranked = {entry["user_id"] for entry in standings}
+        question_ids = [question["id"] for question in state["questions"]]
+        stored = {
+            "session_id": session_id,
+            "quiz_id": state["quiz_id"],
+            "start_time": state.get("start_time"),
+            "end_time": state.get("end_time"),
+            "questions": [
+                {"id": question["id"], "text": question["text"]}
+                for question in state["questions"]
+            ],
+            "standings": {
+                "user_ids": [entry["user_id"] for entry in standings],
+                "scores": [entry["score"] for entry in standings],
+            },
+            "unranked_participants": [
+                user_id for user_id in state["participants"] if user_id not in ranked
+            ],
+            "distributions": await self.sessions.get_distributions(
+                session_id, question_ids
+            ),
+            "archived_at": datetime.utcnow(),
+        }
+        # Completion can run twice when another node adopts the session
+        await self.db.session_archives.replace_one(
+            {"session_id": session_id}, stored, upsert=True
+        )
+        archive = _load_archive(stored)
+        self.archives.set(session_id, archive)
+        return archive.document
+
+    async def _is_completed(self, session_id: str) -> bool:
+        """Whether a session missing from Redis was completed and purged"""
+        if self.archives.get(session_id) is not None:
+            return True
+        session = await self.db.sessions.find_one(
+            {"id": session_id}, {"_id": 0, "status": 1}
+        )
+        return session is not None and session.get("status") == "completed"
+
+    async def get_archive(self, session_id: str) -> Optional[SessionArchive]:
+        """Archive of a completed session whose live Redis keys are gone"""
+        archive = self.archives.get(session_id)
+        if archive is not None:
+            return archive
+        header = await self.sessions.get_header(session_id)
+        if header is not None and header.get("status") != "completed":
+            return None
+
+        stored = await self.db.session_archives.find_one(
+            {"session_id": session_id}, {"_id": 0}
+        )
+        if stored is None:
+            return None
+        archive = _load_archive(stored)
+        self.archives.set(session_id, archive)
+        return archive
+
+    async def compute_session_stats(self, session_id: str) -> Optional[Dict]:
+        """Scan a session's answers once and store its session_stats document"""
+        session = await self.db.sessions.find_one(
+            {"id": session_id},
+            {
+                "_id": 0,
+                "quiz_id": 1,
+                "questions": 1,
+                "participants": 1,
+                "question_started_at": 1,
+            },
+        )
+        if session is None:
+            return None
+
+        # Answers of the last question may still sit in the write buffer
+        await self.answer_writer.flush()
+        columns = AnswerColumns(session["questions"], session.get("participants", []))
+        cursor = self.db.answers.find(
+            {"session_id": session_id},
+            projection={
+                "_id": 0,
+                "user_id": 1,
+                "question_id": 1,
+                "answer": 1,
+                "is_correct": 1,
+                "points": 1,
+                "timestamp": 1,
+            },
+            batch_size=self.settings.EXPORT_BATCH_SIZE,
+        )
+        async for answer in cursor:
+            columns.append(answer)
+
+        started_at = {
+            int(index): value
+            for index, value in (session.get("question_started_at") or {}).items()
+        }
+        stats = await asyncio.to_thread(summarize, columns, started_at)
+        document = {
+            "session_id": session_id,
+            "quiz_id": session["quiz_id"],
+            **stats,
+            "computed_at": datetime.utcnow(),
+        }
+        await self.db.session_stats.replace_one(
+            {"session_id": session_id}, document, upsert=True
+        )
+        document.pop("_id", None)
+        self.session_stats.set(session_id, document)
+        return document
+
+    async def _precompute_stats(self, session_id: str):
+        try:
+            stats = await self.compute_session_stats(session_id)
+            if stats is not None:
+                logger.info(
+                    "Computed stats of session %s from %s answers",
+                    session_id,
+                    stats["answers"],
+                )
+        except Exception as e:
+            # Readers compute them on demand instead
+            logger.error("Error computing stats of session %s: %s", session_id, e)
 
-            is_correct = current_question.correct_answer == answer.answer
-            points = current_question.points if is_correct else 0
+    @timed("get_session_stats")
+    async def get_session_stats(self, session_id: str) -> Dict:
+        """Precomputed statistics of a completed session"""
+        try:
+            stats = self.session_stats.get(session_id)
+            if stats is not None:
+                return stats
 
-            await self.db.answers.insert_one(
-                {
-                    **answer.model_dump(),
-                    "is_correct": is_correct,
-                    "points": points,
-                    "timestamp": datetime.utcnow(),
-                }
+            stats = await self.db.session_stats.find_one(
+                {"session_id": session_id}, {"_id": 0}
             )
+            if stats is None:
+                session = await self.db.sessions.find_one(
+                    {"id": session_id}, {"_id": 0, "status": 1}
+                )
+                if session is None:
+                    raise HTTPException(status_code=404, detail="Session not found")
+                if session["status"] != "completed":
+                    raise HTTPException(
+                        status_code=409, detail="Session is not completed"
+                    )
+                return await self.compute_session_stats(session_id)
 
-            score_key = f"score:{answer.session_id}:{answer.user_id}"
-            total_score = await self.redis.incrby(score_key, points)
+            self.session_stats.set(session_id, stats)
+            return stats
 
-            await self.redis.zadd(
-                f"leaderboard:{answer.session_id}", {answer.user_id: total_score}
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error("Error getting session stats: %s", e)
+            raise HTTPException(
+                status_code=500, detail="Failed to get session stats"
             )
 
-            leaderboard = await self.get_leaderboard(answer.session_id)
+    async def get_session_quiz_id(self, session_id: str) -> Optional[str]:
+        """Get the quiz a session was created from"""
+        quiz_id = self.session_quiz_ids.get(session_id)
+        if quiz_id is None:
+            header = await self._get_header(session_id)
+            if header is None:
+                session = await self.get_session(session_id)
+                if session is None:
+                    return None
+                header = {"quiz_id": session.quiz_id}
+            quiz_id = header["quiz_id"]
+            self.session_quiz_ids.set(session_id, quiz_id)
+        return quiz_id
+
+    @timed("submit_answer")
+    async def submit_answer(self, answer: Answer) -> Dict:
+        try:
+            quiz_id = await self.get_session_quiz_id(answer.session_id)
+            if quiz_id is None:
+                raise HTTPException(status_code=404, detail="Session not found")
 
-            await manager.broadcast_to_session(
+            answer_key = await self.get_answer_key(quiz_id)
+            entry = answer_key.get(answer.question_id) if answer_key else None
+            if entry is None:
+                raise HTTPException(status_code=400, detail="Unknown question")
+
+            actor = await self._actor(answer.session_id)
+            if (
+                actor is not None
+                and actor.header.get("current_question_id") != answer.question_id
+            ):
+                # Late answers are refused from memory; the script checks again
+                raise HTTPException(
+                    status_code=409, detail="Question is not accepting answers"
+                )
+
+            is_correct = entry.correct_answer == answer.answer
+            points = entry.points if is_correct else 0
+
+            result = await self.sessions.score_answer(
                 answer.session_id,
+                answer.user_id,
+                answer.question_id,
+                points,
+                is_correct,
+                window=entry.time_limit + self.settings.ANSWER_DEDUPE_GRACE_SECONDS,
+                # Free-form answers are not counted so they cannot grow the hash
+                option=answer.answer if answer.answer in entry.options else None,
+                limit=self.settings.LEADERBOARD_BROADCAST_SIZE,
+            )
+            if result["status"] == "missing":
+                if await self._is_completed(answer.session_id):
+                    raise HTTPException(
+                        status_code=409, detail="Session is already completed"
+                    )
+                raise HTTPException(status_code=404, detail="Session not found")
+            if result["status"] == "stale":
+                raise HTTPException(
+                    status_code=409, detail="Question is not accepting answers"
+                )
+
+            response = {
+                "status": "success",
+                "is_correct": result["is_correct"],
+                "points": result["points"],
+                "total_score": result["total_score"],
+                "leaderboard": result["leaderboard"],
+            }
+            if result["status"] == "duplicate":
+                # Already scored and persisted by the first submit
+                return {**response, "duplicate": True}
+
+            await self.answer_writer.put(
                 {
-                    "type": "answer_submitted",
-                    "user_id": answer.user_id,
+                    **answer.model_dump(),
                     "is_correct": is_correct,
                     "points": points,
-                    "leaderboard": leaderboard,
-                },
+                    "timestamp": datetime.utcnow(),
+                }
             )
 
-            return {
-                "status": "success",
-                "is_correct": is_correct,
-                "points": points,
-                "total_score": total_score,
-            }
+            self.leaderboard_broadcaster.mark_dirty(answer.session_id)
+            if self.settings.ANSWER_DISTRIBUTION_BROADCAST:
+                self.distribution_broadcaster.mark_dirty(
+                    answer.session_id, answer.question_id
+                )
 
+            return response
+
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Error submitting answer: {str(e)}")
+            logger.error("Error submitting answer: %s", e)
             raise HTTPException(status_code=500, detail="Failed to submit answer")
 
+    @timed("get_answer_distribution")
+    async def get_answer_distribution(self, session_id: str, question_id: str) -> Dict:
+        """Count of first answers per option, read from live counters"""
+        quiz_id = await self.get_session_quiz_id(session_id)
+        if quiz_id is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+
+        answer_key = await self.get_answer_key(quiz_id)
+        entry = answer_key.get(question_id) if answer_key else None
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Question not found")
+
+        counts = await self.sessions.get_distribution(session_id, question_id)
+        if not counts:
+            archive = await self.get_archive(session_id)
+            if archive is not None:
+                counts = archive.document["distributions"].get(question_id, {})
+        counts = {option: counts.get(option, 0) for option in entry.options}
+        return {
+            "session_id": session_id,
+            "question_id": question_id,
+            "counts": counts,
+            "total": sum(counts.values()),
+        }
+
+    @timed("add_participant")
     async def add_participant(
         self, session_id: str, user_id: str, notify: bool = True
-    ) -> QuizSession:
-        """Add participant to session"""
+    ) -> bool:
+        """Add participant to session, returns False if already joined"""
         try:
             if self.db is None:
                 raise HTTPException(
                     status_code=500, detail="Database connection not initialized"
                 )
 
-            session = await self.get_session(session_id)
-            if not session:
-                raise HTTPException(status_code=404, detail="Session not found")
+            if await self._get_header(session_id) is None:
+                if await self.get_session(session_id) is None:
+                    raise HTTPException(status_code=404, detail="Session not found")
 
-            if user_id not in session.participants:
-                result = await self.db.sessions.find_one_and_update(
-                    {"id": session_id},
-                    {"$addToSet": {"participants": user_id}},
-                    return_document=True,
+            actor = await self._actor(session_id)
+            if actor is not None:
+                roster_version = await actor.execute(
+                    session_actor.add_participant(user_id)
+                )
+                if roster_version is None:
+                    return False
+            else:
+                roster_version = await self.sessions.add_participant(
+                    session_id, user_id
                 )
+                if roster_version is None:
+                    return False
 
-                if not result:
+                result = await self.db.sessions.update_one(
+                    {"id": session_id}, {"$addToSet": {"participants": user_id}}
+                )
+                if result.matched_count == 0:
                     raise HTTPException(
                         status_code=404, detail="Session not found during update"
                     )
 
-                session_key = f"quiz_session:{session_id}"
-                try:
-                    session_data = await self.redis.get(session_key)
-                    if session_data:
-                        session_obj = QuizSession.model_validate_json(session_data)
-                        session_obj.participants.append(user_id)
-                        await self.redis.set(
-                            session_key, session_obj.model_dump_json(), ex=3600
-                        )
-                except Exception as e:
-                    logger.error(f"Error updating Redis cache: {e}")
+            logger.info("Added participant %s to session %s", user_id, session_id)
 
-                session = QuizSession.model_validate(result)
-                logger.info(
-                    f"Successfully added participant {user_id} to session {session_id}"
+            if notify and self.settings.ROSTER_UPDATE_MODE == "delta":
+                self.roster_batcher.record(session_id, user_id, True, roster_version)
+            elif notify:
+                await manager.broadcast_to_session(
+                    session_id,
+                    {
+                        "type": "participant_joined",
+                        "user_id": user_id,
+                        "participants": await self.sessions.get_participants(
+                            session_id
+                        ),
+                    },
                 )
 
-                if notify:
-                    await manager.broadcast_to_session(
-                        session_id,
-                        {
-                            "type": "participant_joined",
-                            "user_id": user_id,
-                            "participants": session.participants,
-                        },
-                    )
-
-            return session
+            return True
 
         except HTTPException:
             raise
         except Exception as e:
-            logger.error(f"Error adding participant: {str(e)}")
+            logger.error("Error adding participant: %s", e)
             raise HTTPException(
                 status_code=500, detail=f"Failed to add participant: {str(e)}"
             )
 
+    @timed("remove_participant")
     async def remove_participant(
         self, session_id: str, user_id: str, notify: bool = True
-    ) -> QuizSession:
-        """Remove participant from session"""
+    ) -> bool:
+        """Remove participant from session, returns False if not present"""
         try:
             if self.db is None:
                 raise HTTPException(
                     status_code=500, detail="Database connection not initialized"
                 )
 
-            result = await self.db.sessions.find_one_and_update(
-                {"id": session_id},
-                {"$pull": {"participants": user_id}},
-                return_document=True,
-            )
-
-            if not result:
-                raise HTTPException(status_code=404, detail="Session not found")
+            actor = await self._actor(session_id)
+            if actor is not None:
+                roster_version = await actor.execute(
+                    session_actor.remove_participant(user_id)
+                )
+                removed = roster_version is not None
+            else:
+                result = await self.db.sessions.update_one(
+                    {"id": session_id}, {"$pull": {"participants": user_id}}
+                )
+                if result.matched_count == 0:
+                    raise HTTPException(status_code=404, detail="Session not found")
 
-            session_key = f"quiz_session:{session_id}"
-            try:
-                session_data = await self.redis.get(session_key)
-                if session_data:
-                    session_obj = QuizSession.model_validate_json(session_data)
-                    if user_id in session_obj.participants:
-                        session_obj.participants.remove(user_id)
-                        await self.redis.set(
-                            session_key, session_obj.model_dump_json(), ex=3600
-                        )
-            except Exception as e:
-                logger.error(f"Error updating Redis cache: {e}")
+                roster_version = None
+                try:
+                    roster_version = await self.sessions.remove_participant(
+                        session_id, user_id
+                    )
+                    removed = roster_version is not None
+                except Exception as e:
+                    logger.error("Error updating Redis session: %s", e)
+                    removed = result.modified_count > 0
 
-            session = QuizSession.model_validate(result)
-            logger.info(
-                f"Successfully removed participant {user_id} from session {session_id}"
-            )
-            logger.debug(f"Current participants: {session.participants}")
+            logger.info("Removed participant %s from session %s", user_id, session_id)
 
-            if notify:
+            if notify and self.settings.ROSTER_UPDATE_MODE == "delta":
+                if roster_version is not None:
+                    self.roster_batcher.record(
+                        session_id, user_id, False, roster_version
+                    )
+            elif notify:
                 await manager.broadcast_to_session(
                     session_id,
                     {
                         "type": "participant_left",
                         "user_id": user_id,
-                        "participants": session.participants,
+                        "participants": await self.sessions.get_participants(
+                            session_id
+                        ),
                     },
                 )
 
-            return session
+            return removed
 
         except HTTPException:
             raise
         except Exception as e:
-            logger.error(f"Error removing participant: {str(e)}")
+            logger.error("Error removing participant: %s", e)
             raise HTTPException(
                 status_code=500, detail=f"Failed to remove participant: {str(e)}"
             )
 
+    @timed("get_session_snapshot")
+    async def get_session_snapshot(self, session_id: str) -> Optional[EncodedMessage]:
+        """Get the session_state message for a joining socket.
+
+        Everything but the roster is cached per session, encoded, and only
+        rebuilt when the status or question index in the header changes.
+        Concurrent joins that miss on the same version share one build;
+        the roster is read and encoded for each join.
+        """
+        header = await self._get_header(session_id)
+        if header is None:
+            # Repopulates Redis from MongoDB unless the session is completed
+            session = await self.get_session(session_id)
+            if session is None:
+                return None
+            header = await self._get_header(session_id)
+            if header is None:
+                state = session.model_dump(mode="json")
+                return MessageTemplate(_session_state(session_id, state)).render(
+                    participants=state["participants"], roster_version=0
+                )
+
+        version = (header["status"], header.get("current_question", 0))
+        cached = self.session_snapshots.get(session_id)
+        if cached is not None and cached[0] == version:
+            template = cached[1]
+        else:
+            key = (session_id, version)
+            build = self._snapshot_builds.get(key)
+            if build is None:
+                build = asyncio.ensure_future(self._build_snapshot(session_id))
+                self._snapshot_builds[key] = build
+                build.add_done_callback(
+                    lambda _: self._snapshot_builds.pop(key, None)
+                )
+            template = await asyncio.shield(build)
+            if template is None:
+                return None
+
+        roster_version, participants = await self._roster(session_id)
+        return template.render(
+            participants=participants, roster_version=roster_version
+        )
+
+    async def _build_snapshot(self, session_id: str) -> Optional[MessageTemplate]:
+        actor = await self._actor(session_id)
+        if actor is not None:
+            state = actor.state()
+        else:
+            state = await self.sessions.read_state(session_id)
+        if state is None:
+            if await self.get_session(session_id) is None:
+                return None
+            state = await self.sessions.read_state(session_id)
+            if state is None:
+                return None
+
+        template = MessageTemplate(_session_state(session_id, state))
+        version = (state["status"], state.get("current_question", 0))
+        self.session_snapshots.set(session_id, (version, template))
+        return template
+
+    async def _roster(self, session_id: str) -> Tuple[int, List[str]]:
+        actor = await self._actor(session_id)
+        if actor is not None:
+            return actor.header["roster_version"], sorted(actor.participants)
+        return await self.sessions.get_roster(session_id)
+
+    async def get_roster(self, session_id: str) -> Dict:
+        """Full participant list with its roster version, for resyncing clients"""
+        version, participants = await self._roster(session_id)
+        return {
+            "type": "roster_snapshot",
+            "session_id": session_id,
+            "version": version,
+            "participants": participants,
+        }
+
+    async def export_session(
+        self, session_id: str, format: str = "ndjson"
+    ) -> AsyncIterator[bytes]:
+        """Stream a session's answers followed by its standings.
+
+        Answers come from a MongoDB cursor walking the session's answer
+        index and standings from the leaderboard in fixed-size slices, so
+        memory stays flat however many answers a session has.
+        """
+        if await self.get_session_quiz_id(session_id) is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+
+        # Include answers still sitting in the write-behind buffer
+        await self.answer_writer.flush()
+        return self._encode_export(session_id, format)
+
+    async def _encode_export(self, session_id: str, format: str):
+        buffer = io.StringIO()
+        writer = None
+        if format == "csv":
+            writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+            writer.writeheader()
+
+        async for record in self._export_records(session_id):
+            if writer is not None:
+                writer.writerow(record)
+            else:
+                buffer.write(json.dumps(record, separators=(",", ":")))
+                buffer.write("\n")
+            if buffer.tell() >= self.settings.EXPORT_CHUNK_BYTES:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    async def _export_records(self, session_id: str):
+        batch_size = self.settings.EXPORT_BATCH_SIZE
+        cursor = self.db.answers.find(
+            {"session_id": session_id},
+            projection={
+                "_id": 0,
+                "user_id": 1,
+                "question_id": 1,
+                "answer": 1,
+                "is_correct": 1,
+                "points": 1,
+                "timestamp": 1,
+            },
+            batch_size=batch_size,
+        ).sort([("question_id", 1), ("user_id", 1)])
+        async for answer in cursor:
+            timestamp = answer.get("timestamp")
+            if isinstance(timestamp, datetime):
+                answer["timestamp"] = timestamp.isoformat()
+            yield {"record": "answer", **answer}
+
+        key = leaderboard_key(session_id)
+        live = await self.redis.zcard(key)
+        archive = None if live else await self.get_archive(session_id)
+
+        if archive is not None:
+            for standing in archive.document["standings"]:
+                yield {"record": "standing", **standing}
+        elif live:
+            start = 0
+            while True:
+                entries = await self.redis.zrevrange(
+                    key, start, start + batch_size - 1, withscores=True
+                )
+                for offset, (user_id, score) in enumerate(entries):
+                    yield {
+                        "record": "standing",
+                        "rank": start + offset + 1,
+                        "user_id": user_id,
+                        "score": int(score),
+                    }
+                if len(entries) < batch_size:
+                    break
+                start += batch_size
+        else:
+            # The live leaderboard expired, rebuild standings from the answers
+            pipeline = [
+                {"$match": {"session_id": session_id}},
+                {"$group": {"_id": "$user_id", "score": {"$sum": "$points"}}},
+                {"$sort": {"score": -1, "_id": 1}},
+            ]
+            rank = 0
+            async for standing in self.db.answers.aggregate(
+                pipeline, allowDiskUse=True, batchSize=batch_size
+            ):
+                rank += 1
+                yield {
+                    "record": "standing",
+                    "rank": rank,
+                    "user_id": standing["_id"],
+                    "score": standing["score"],
+                }
+
+    @timed("get_session")
     async def get_session(self, session_id: str) -> Optional[QuizSession]:
         """Get session details with retry mechanism"""
         try:
             if self.db is None:
                 await self.setup()
 
-            session_key = f"quiz_session:{session_id}"
-            session_data = await self.redis.get(session_key)
-
-            if session_data:
-                return QuizSession.model_validate_json(session_data)
+            session = await self.sessions.load(session_id)
+            if session is not None:
+                return session
 
             session_doc = await self.db.sessions.find_one({"id": session_id})
             if not session_doc:
                 return None
 
             session = QuizSession.model_validate(session_doc)
+            if session.status == "completed":
+                # Finished sessions are served from MongoDB, not cached again
+                return session
 
             try:
-                await self.redis.set(
-                    session_key, session.model_dump_json(), ex=3600  # 1 hour expiry
-                )
+                await self.sessions.save(session)
             except Exception as e:
-                logger.error(f"Error updating Redis cache: {e}")
+                logger.error("Error updating Redis cache: %s", e)
 
             return session
 
         except Exception as e:
-            logger.error(f"Error getting session: {str(e)}")
+            logger.error("Error getting session: %s", e)
             raise HTTPException(
                 status_code=500, detail=f"Failed to get session: {str(e)}"
             )
@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import math
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional
+
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+DEADLINES_KEY = "scheduler:deadlines"
+
+# Takes or renews the lease when it is free or already held by this node.
+# KEYS: lease key  ARGV: node id, ttl in milliseconds
+ACQUIRE_LEASE_SCRIPT = """
+local owner = redis.call('GET', KEYS[1])
+if owner == false or owner == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', tonumber(ARGV[2]))
+    return 1
+end
+return 0
+"""
+
+# Deletes the lease only if this node still holds it.
+# KEYS: lease key  ARGV: node id
+RELEASE_LEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def lease_key(session_id: str) -> str:
+    return f"scheduler:lease:{session_id}"
+
+
+class HierarchicalTimerWheel:
+    """Hashed hierarchical timer wheel with O(1) schedule and cancel.
+
+    Level ``n`` has ``slots`` buckets of ``slots ** n`` ticks each. Timers
+    are filed at the coarsest level that still resolves their deadline and
+    cascade to finer levels as the wheel turns, so advancing one tick only
+    touches the timers that are due plus the occasional cascading bucket.
+    """
+
+    def __init__(self, slots: int = 64, levels: int = 4):
+        self.slots = slots
+        self.levels = levels
+        self.current_tick = 0
+        self._wheels: List[List[Dict[Hashable, int]]] = [
+            [{} for _ in range(slots)] for _ in range(levels)
+        ]
+        self._positions: Dict[Hashable, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._positions
+
+    def schedule(self, key: Hashable, ticks: int):
+        """Fire ``key`` after ``ticks`` ticks, replacing any pending timer"""
+        self.cancel(key)
+        self._place(key, self.current_tick + max(1, ticks))
+
+    def cancel(self, key: Hashable):
+        position = self._positions.pop(key, None)
+        if position is not None:
+            level, slot = position
+            del self._wheels[level][slot][key]
+
+    def advance(self) -> List[Hashable]:
+        """Move one tick forward and return the keys that expired"""
+        self.current_tick += 1
+
+        for level in range(1, self.levels):
+            span = self.slots**level
+            if self.current_tick % span:
+                break
+            slot = (self.current_tick // span) % self.slots
+            bucket, self._wheels[level][slot] = self._wheels[level][slot], {}
+            for key, deadline in bucket.items():
+                self._place(key, deadline)
+
+        slot = self.current_tick % self.slots
+        expired, self._wheels[0][slot] = self._wheels[0][slot], {}
+        for key in expired:
+            del self._positions[key]
+        return list(expired)
+
+    def _place(self, key: Hashable, deadline: int):
+        horizon = self.slots**self.levels - 1
+        deadline = min(deadline, self.current_tick + horizon)
+        delta = deadline - self.current_tick
+
+        level = 0
+        while level < self.levels - 1 and delta >= self.slots ** (level + 1):
+            level += 1
+        slot = (deadline // self.slots**level) % self.slots
+
+        self._wheels[level][slot][key] = deadline
+        self._positions[key] = (level, slot)
+
+
+class QuestionScheduler:
+    """Drives question deadlines of every live session from one task.
+
+    Deadlines are kept in a local timer wheel and mirrored to the
+    ``scheduler:deadlines`` sorted set. A session is only driven by the node
+    holding its Redis lease; a periodic sweep lets any node adopt sessions
+    whose deadline passed without the lease holder acting on it.
+
+    ``on_deadline`` advances the session and returns the number of seconds
+    until its next deadline, or None once the session needs no more timers.
+    """
+
+    def __init__(
+        self,
+        on_deadline: Callable[[str], Awaitable[Optional[float]]],
+        tick: float = 0.1,
+        lease_grace: float = 5.0,
+        sweep_interval: float = 5.0,
+    ):
+        self.on_deadline = on_deadline
+        self.tick = tick
+        self.lease_grace = lease_grace
+        self.sweep_interval = sweep_interval
+        self.node_id = uuid.uuid4().hex
+        self.redis: Redis = None
+        self._wheel = HierarchicalTimerWheel()
+        self._task: Optional[asyncio.Task] = None
+        self._sweeper: Optional[asyncio.Task] = None
+        self._acquire_lease = None
+        self._release_lease = None
+
+    def start(self, redis: Redis):
+        self.redis = redis
+        self._acquire_lease = redis.register_script(ACQUIRE_LEASE_SCRIPT)
+        self._release_lease = redis.register_script(RELEASE_LEASE_SCRIPT)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            self._sweeper = asyncio.create_task(self._sweep())
+
+    async def stop(self):
+        for task in (self._task, self._sweeper):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._sweeper = None
+
+    async def schedule(self, session_id: str, delay: float) -> bool:
+        """Set the next deadline of a session, returns False if another node owns it"""
+        lease_ms = int((delay + self.lease_grace) * 1000)
+        if not await self._acquire_lease(
+            keys=[lease_key(session_id)], args=[self.node_id, lease_ms]
+        ):
+            return False
+
+        await self.redis.zadd(DEADLINES_KEY, {session_id: time.time() + delay})
+        self._wheel.schedule(session_id, math.ceil(delay / self.tick))
+        return True
+
+    async def cancel(self, session_id: str):
+        """Stop driving a session and give up its lease"""
+        self._wheel.cancel(session_id)
+        await self.redis.zrem(DEADLINES_KEY, session_id)
+        await self._release_lease(keys=[lease_key(session_id)], args=[self.node_id])
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        while True:
+            await asyncio.sleep(self.tick)
+            # Catch up on every tick that elapsed, even if the loop lagged
+            target = int((loop.time() - started) / self.tick)
+            while self._wheel.current_tick < target:
+                for session_id in self._wheel.advance():
+                    asyncio.create_task(self._fire(session_id))
+
+    async def _fire(self, session_id: str):
+        try:
+            if not await self._acquire_lease(
+                keys=[lease_key(session_id)],
+                args=[self.node_id, int(self.lease_grace * 1000)],
+            ):
+                return
+
+            delay = await self.on_deadline(session_id)
+            if delay is None:
+                await self.cancel(session_id)
+            else:
+                await self.schedule(session_id, delay)
+        except Exception as e:
+            logger.error("Error advancing session %s: %s", session_id, e)
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                overdue = await self.redis.zrangebyscore(
+                    DEADLINES_KEY,
+                    "-inf",
+                    time.time() - self.lease_grace,
+                    start=0,
+                    num=100,
+                )
+                for session_id in overdue:
+                    if session_id not in self._wheel:
+                        asyncio.create_task(self._fire(session_id))
+            except Exception as e:
+                logger.error("Error sweeping overdue sessions: %s", e)
@@ -0,0 +1,319 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.utils.redis_utils import SessionStore
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# Queued by ``stop`` to make an actor exit after the commands before it
+_STOP = object()
+
+
+class CommandRejected(Exception):
+    """A command that does not apply to the session's current state"""
+
+
+class ActorStopped(Exception):
+    """The actor exited before it could run a command"""
+
+
+class WriteBatch:
+    """Writes produced by a run of commands, persisted together"""
+
+    def __init__(self):
+        self.header: Dict[str, Any] = {}
+        self.roster: List[Tuple[str, str]] = []
+        self.mongo: List[UpdateOne] = []
+
+    def set_header(self, actor: "SessionActor", **fields):
+        for field, value in fields.items():
+            self.header[field] = value
+            # Mirror the decoded form get_header returns
+            if value is None:
+                actor.header.pop(field, None)
+            elif isinstance(value, datetime):
+                actor.header[field] = value.isoformat()
+            else:
+                actor.header[field] = value
+
+
+Command = Callable[["SessionActor", WriteBatch], Any]
+
+
+class SessionActor:
+    """Owns the live state of one session and applies commands to it in order.
+
+    Commands run one at a time against the in-memory header, roster and
+    questions, so they never race each other. The writes of every command
+    drained from the queue in one go are sent to Redis as one transaction
+    and to MongoDB as one ordered bulk write before their callers resume.
+    If persisting fails the actor exits, and the next access reloads the
+    session from Redis.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        state: Dict,
+        store: SessionStore,
+        collection: AsyncIOMotorCollection,
+        batch_size: int,
+        idle_timeout: float,
+        on_exit: Callable[["SessionActor"], None],
+    ):
+        self.session_id = session_id
+        self.participants = set(state["participants"])
+        self.questions: List[Dict] = state["questions"]
+        self.header = {
+            field: value
+            for field, value in state.items()
+            if field not in ("participants", "questions")
+        }
+        self.store = store
+        self.collection = collection
+        self.batch_size = batch_size
+        self.idle_timeout = idle_timeout
+        self.on_exit = on_exit
+        self.last_used = time.monotonic()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    @property
+    def running(self) -> bool:
+        return not self._task.done()
+
+    def state(self) -> Dict:
+        """Copy of the state in the shape of ``SessionStore.read_state``"""
+        self.last_used = time.monotonic()
+        return {
+            **self.header,
+            "participants": sorted(self.participants),
+            "questions": self.questions,
+        }
+
+    async def execute(self, command: Command) -> Any:
+        if not self.running:
+            raise ActorStopped(self.session_id)
+        self.last_used = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((command, future))
+        return await future
+
+    async def stop(self):
+        if self.running:
+            self._queue.put_nowait(_STOP)
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self):
+        try:
+            stopping = False
+            while not stopping:
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    if time.monotonic() - self.last_used >= self.idle_timeout:
+                        break
+                    continue
+                if item is _STOP:
+                    break
+
+                batch = WriteBatch()
+                settled = []
+                while True:
+                    command, future = item
+                    try:
+                        settled.append((future, command(self, batch), None))
+                    except Exception as e:
+                        settled.append((future, None, e))
+                    if len(settled) >= self.batch_size or self._queue.empty():
+                        break
+                    item = self._queue.get_nowait()
+                    if item is _STOP:
+                        stopping = True
+                        break
+
+                try:
+                    await self._persist(batch)
+                except Exception as e:
+                    logger.error("Error persisting session %s: %s", self.session_id, e)
+                    for future, _, _ in settled:
+                        if not future.done():
+                            future.set_exception(e)
+                    return
+
+                for future, result, error in settled:
+                    if future.done():
+                        continue
+                    if error is not None:
+                        future.set_exception(error)
+                    else:
+                        future.set_result(result)
+        finally:
+            self.on_exit(self)
+            while not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is not _STOP and not item[1].done():
+                    item[1].set_exception(ActorStopped(self.session_id))
+
+    async def _persist(self, batch: WriteBatch):
+        if batch.header or batch.roster:
+            await self.store.write_batch(self.session_id, batch.header, batch.roster)
+        if batch.mongo:
+            await self.collection.bulk_write(batch.mongo, ordered=True)
+
+
+class SessionActors:
+    """Registry creating one actor per live session on first use.
+
+    Only the node running a session's actor may mutate that session, so
+    actor mode needs requests for a session to reach a single node, for
+    example through session-sticky routing.
+    """
+
+    def __init__(
+        self,
+        store: SessionStore,
+        collection: AsyncIOMotorCollection,
+        batch_size: int = 256,
+        idle_timeout: float = 300.0,
+    ):
+        self.store = store
+        self.collection = collection
+        self.batch_size = batch_size
+        self.idle_timeout = idle_timeout
+        self._actors: Dict[str, SessionActor] = {}
+        self._loading: Dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._actors)
+
+    async def get(self, session_id: str) -> Optional[SessionActor]:
+        """The session's actor, or None if the session is not live in Redis"""
+        actor = self._actors.get(session_id)
+        if actor is not None and actor.running:
+            # Keeps it from idling out before the caller's command arrives
+            actor.last_used = time.monotonic()
+            return actor
+
+        loading = self._loading.get(session_id)
+        if loading is None:
+            loading = asyncio.ensure_future(self._spawn(session_id))
+            self._loading[session_id] = loading
+            loading.add_done_callback(lambda _: self._loading.pop(session_id, None))
+        return await asyncio.shield(loading)
+
+    async def drop(self, session_id: str):
+        actor = self._actors.pop(session_id, None)
+        if actor is not None:
+            await actor.stop()
+
+    async def stop(self):
+        actors, self._actors = list(self._actors.values()), {}
+        await asyncio.gather(*(actor.stop() for actor in actors))
+
+    async def _spawn(self, session_id: str) -> Optional[SessionActor]:
+        state = await self.store.read_state(session_id)
+        if state is None:
+            return None
+        actor = SessionActor(
+            session_id,
+            state,
+            self.store,
+            self.collection,
+            self.batch_size,
+            self.idle_timeout,
+            self._forget,
+        )
+        self._actors[session_id] = actor
+        return actor
+
+    def _forget(self, actor: SessionActor):
+        if self._actors.get(actor.session_id) is actor:
+            del self._actors[actor.session_id]
+
+
+def add_participant(user_id: str) -> Command:
+    """Returns the new roster version, or None if already present"""
+
+    def command(actor: SessionActor, batch: WriteBatch) -> Optional[int]:
+        if user_id in actor.participants:
+            return None
+        actor.participants.add(user_id)
+        batch.roster.append(("SADD", user_id))
+        batch.set_header(actor, roster_version=actor.header["roster_version"] + 1)
+        batch.mongo.append(
+            UpdateOne(
+                {"id": actor.session_id}, {"$addToSet": {"participants": user_id}}
+            )
+        )
+        return actor.header["roster_version"]
+
+    return command
+
+
+def remove_participant(user_id: str) -> Command:
+    """Returns the new roster version, or None if not present"""
+
+    def command(actor: SessionActor, batch: WriteBatch) -> Optional[int]:
+        if user_id not in actor.participants:
+            return None
+        actor.participants.discard(user_id)
+        batch.roster.append(("SREM", user_id))
+        batch.set_header(actor, roster_version=actor.header["roster_version"] + 1)
+        batch.mongo.append(
+            UpdateOne({"id": actor.session_id}, {"$pull": {"participants": user_id}})
+        )
+        return actor.header["roster_version"]
+
+    return command
+
+
+def start_session() -> Command:
+    """Activate a waiting session, returns its first question"""
+
+    def command(actor: SessionActor, batch: WriteBatch) -> Dict:
+        if actor.header.get("status") != "waiting":
+            raise CommandRejected("Session is not in waiting state")
+        if not actor.questions:
+            raise CommandRejected("Session has no questions")
+
+        now = datetime.utcnow()
+        first = actor.questions[0]
+        batch.set_header(
+            actor,
+            status="active",
+            current_question=0,
+            current_question_id=first["id"],
+            updated_at=now,
+        )
+        batch.mongo.append(
+            UpdateOne(
+                {"id": actor.session_id},
+                {
+                    "$set": {
+                        "status": "active",
+                        "current_question": 0,
+                        "question_started_at.0": now,
+                        "updated_at": now,
+                    }
+                },
+            )
+        )
+        return first
+
+    return command
+
+
+def update_session(mongo_set: Dict, **fields) -> Command:
+    """Set header fields and the matching MongoDB fields"""
+
+    def command(actor: SessionActor, batch: WriteBatch):
+        batch.set_header(actor, **fields)
+        batch.mongo.append(UpdateOne({"id": actor.session_id}, {"$set": mongo_set}))
+
+    return command
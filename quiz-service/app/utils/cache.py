@@ -0,0 +1,80 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from app.core.metrics import CACHE_EVICTIONS, CACHE_LOOKUPS, CACHE_SIZE
+
+
+class TTLCache:
+    """Bounded in-memory cache with per-entry expiry and LRU eviction.
+
+    Not thread-safe; it is meant to be used from a single event loop.
+    A cache given a ``name`` exports its hits, misses, evictions and size
+    as Prometheus metrics labelled with that name.
+    """
+
+    def __init__(
+        self, maxsize: int = 1024, ttl: float = 300.0, name: Optional[str] = None
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._hit_counter = self._miss_counter = self._eviction_counter = None
+        if name is not None:
+            self._hit_counter = CACHE_LOOKUPS.labels(name, "hit")
+            self._miss_counter = CACHE_LOOKUPS.labels(name, "miss")
+            self._eviction_counter = CACHE_EVICTIONS.labels(name)
+            CACHE_SIZE.labels(name).set_function(self.__len__)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self._miss()
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self._miss()
+            return None
+
+        self._data.move_to_end(key)
+        self._hits += 1
+        if self._hit_counter is not None:
+            self._hit_counter.inc()
+        return value
+
+    def _miss(self):
+        self._misses += 1
+        if self._miss_counter is not None:
+            self._miss_counter.inc()
+
+    def set(self, key: Hashable, value: Any):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self._evictions += 1
+            if self._eviction_counter is not None:
+                self._eviction_counter.inc()
+
+    def invalidate(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._data),
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+        }
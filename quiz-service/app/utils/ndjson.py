@@ -0,0 +1,45 @@
+from typing import AsyncIterator, Optional, Tuple
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_line_bytes: int
+) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """Split a streamed body into ``(line number, line)`` pairs.
+
+    Only the current line is buffered. Lines longer than ``max_line_bytes``
+    are discarded and yielded as None so callers can report them; blank
+    lines are skipped but still counted.
+    """
+    buffer = bytearray()
+    line_number = 0
+    oversized = False
+
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end == -1:
+                if not oversized:
+                    buffer += chunk[start:]
+                    if len(buffer) > max_line_bytes:
+                        oversized = True
+                        buffer.clear()
+                break
+
+            line_number += 1
+            if oversized:
+                yield line_number, None
+            else:
+                buffer += chunk[start:end]
+                if len(buffer) > max_line_bytes:
+                    yield line_number, None
+                elif buffer.strip():
+                    yield line_number, bytes(buffer)
+            buffer.clear()
+            oversized = False
+            start = end + 1
+
+    if oversized or buffer.strip():
+        line_number += 1
+        yield line_number, None if oversized else bytes(buffer)
+
@@ -0,0 +1,482 @@
+import json
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from app.models.quiz import Question, QuizSession
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+# Scalar session fields stored in the session header hash. Participants and
+# questions live in their own keys so hot paths never touch the full session.
+HEADER_FIELDS = (
+    "id",
+    "quiz_id",
+    "status",
+    "current_question",
+    "current_question_id",
+    "total_questions",
+    "start_time",
+    "end_time",
+    "updated_at",
+)
+
+
+def session_key(session_id: str) -> str:
+    return f"session:{session_id}"
+
+
+def participants_key(session_id: str) -> str:
+    return f"session:{session_id}:participants"
+
+
+def questions_key(session_id: str) -> str:
+    return f"session:{session_id}:questions"
+
+
+def legacy_session_key(session_id: str) -> str:
+    """Key of the pre-normalization JSON blob holding the whole session"""
+    return f"quiz_session:{session_id}"
+
+
+def score_key(session_id: str, user_id: str) -> str:
+    return f"score:{session_id}:{user_id}"
+
+
+def leaderboard_key(session_id: str) -> str:
+    return f"leaderboard:{session_id}"
+
+
+def distribution_key(session_id: str, question_id: str) -> str:
+    return f"distribution:{session_id}:{question_id}"
+
+
+def answered_key(session_id: str, question_id: str, user_id: str) -> str:
+    return f"answered:{session_id}:{question_id}:{user_id}"
+
+
+# Applies the points of an answer to the current question and returns the
+# updated total together with the top of the leaderboard in one round trip.
+# The outcome is remembered per (session, question, user) so a repeated
+# submit returns it again instead of scoring twice, and first answers are
+# counted per option. Correctness is decided by the caller from its
+# compiled answer key.
+# KEYS: session header, user score, leaderboard, answered marker,
+#       option counters
+# ARGV: user_id, question_id, points, leaderboard limit, is_correct (0/1),
+#       marker ttl in seconds, option to count (empty for none),
+#       session ttl in seconds
+SCORE_ANSWER_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'current_question_id')
+if not current then
+    return {'missing'}
+end
+if current ~= ARGV[2] then
+    return {'stale'}
+end
+local limit = tonumber(ARGV[4]) - 1
+local previous = redis.call('GET', KEYS[4])
+if previous then
+    return {'duplicate', previous, redis.call('ZREVRANGE', KEYS[3], 0, limit, 'WITHSCORES')}
+end
+local total = redis.call('INCRBY', KEYS[2], tonumber(ARGV[3]))
+redis.call('ZADD', KEYS[3], total, ARGV[1])
+redis.call('EXPIRE', KEYS[2], tonumber(ARGV[8]))
+redis.call('EXPIRE', KEYS[3], tonumber(ARGV[8]))
+redis.call('SET', KEYS[4], ARGV[5] .. ':' .. ARGV[3] .. ':' .. total, 'EX', tonumber(ARGV[6]))
+if ARGV[7] ~= '' then
+    redis.call('HINCRBY', KEYS[5], ARGV[7], 1)
+    redis.call('EXPIRE', KEYS[5], tonumber(ARGV[8]))
+end
+local top = redis.call('ZREVRANGE', KEYS[3], 0, limit, 'WITHSCORES')
+return {'ok', total, top}
+"""
+
+
+# Adds or removes a participant and bumps the roster version on a change.
+# Returns the new version, 0 when the header is gone, or nil when the
+# participant set was left unchanged.
+# KEYS: session header, participants  ARGV: user_id, SADD or SREM
+UPDATE_ROSTER_SCRIPT = """
+if redis.call(ARGV[2], KEYS[2], ARGV[1]) == 0 then
+    return false
+end
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+return redis.call('HINCRBY', KEYS[1], 'roster_version', 1)
+"""
+
+
+def parse_scores(scores: List) -> List[Dict]:
+    """Convert a flat ``[member, score, ...]`` reply into leaderboard entries"""
+    return [
+        {"user_id": scores[i], "score": int(float(scores[i + 1]))}
+        for i in range(0, len(scores), 2)
+    ]
+
+
+def _encode_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _encode_header(session: QuizSession) -> Dict[str, str]:
+    values = session.model_dump(include=set(HEADER_FIELDS))
+    values["total_questions"] = len(session.questions)
+    # Only an active session has a question accepting answers
+    if session.status == "active" and session.current_question < len(
+        session.questions
+    ):
+        values["current_question_id"] = session.questions[session.current_question].id
+    return {field: _encode_value(values.get(field)) for field in HEADER_FIELDS}
+
+
+def _decode_header(header: Dict[str, str]) -> Dict:
+    decoded = {field: value for field, value in header.items() if value != ""}
+    decoded.setdefault("roster_version", 0)
+    for field in ("current_question", "total_questions", "roster_version"):
+        if field in decoded:
+            decoded[field] = int(decoded[field])
+    return decoded
+
+
+class SessionStore:
+    """Normalized Redis layout for live quiz sessions.
+
+    ``session:{id}`` is a hash with the scalar header fields,
+    ``session:{id}:participants`` a set of user ids and
+    ``session:{id}:questions`` a list of question JSON documents that is
+    written once when the session is cached and never modified afterwards.
+    The header's ``roster_version`` counter is bumped on every change to
+    the participant set.
+    """
+
+    def __init__(self, redis: Redis, ttl: int = 3600):
+        self.redis = redis
+        self.ttl = ttl
+        self._score_answer = redis.register_script(SCORE_ANSWER_SCRIPT)
+        self._update_roster = redis.register_script(UPDATE_ROSTER_SCRIPT)
+
+    def _expire_all(self, pipe, session_id: str):
+        pipe.expire(session_key(session_id), self.ttl)
+        pipe.expire(participants_key(session_id), self.ttl)
+        pipe.expire(questions_key(session_id), self.ttl)
+
+    async def save(self, session: QuizSession):
+        """Write the full session, replacing whatever is stored for it"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            # The header hash is overwritten rather than deleted so the roster
+            # version keeps increasing across rewrites
+            pipe.delete(participants_key(session.id), questions_key(session.id))
+            pipe.hset(session_key(session.id), mapping=_encode_header(session))
+            pipe.hincrby(session_key(session.id), "roster_version", 1)
+            if session.participants:
+                pipe.sadd(participants_key(session.id), *session.participants)
+            if session.questions:
+                pipe.rpush(
+                    questions_key(session.id),
+                    *[q.model_dump_json() for q in session.questions],
+                )
+            self._expire_all(pipe, session.id)
+            await pipe.execute()
+
+    async def load(self, session_id: str) -> Optional[QuizSession]:
+        """Assemble the full session; migrates a legacy blob on first read"""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(session_key(session_id))
+            pipe.smembers(participants_key(session_id))
+            pipe.lrange(questions_key(session_id), 0, -1)
+            header, participants, questions = await pipe.execute()
+
+        if not header:
+            return await self.migrate_legacy(session_id)
+
+        return QuizSession.model_validate(
+            {
+                **_decode_header(header),
+                "participants": sorted(participants),
+                "questions": [Question.model_validate_json(q) for q in questions],
+            }
+        )
+
+    async def read_state(self, session_id: str) -> Optional[Dict]:
+        """Read header, participants and raw questions in one transaction.
+
+        Unlike ``load`` this skips model validation and keeps the header's
+        ``roster_version`` consistent with the participants returned.
+        """
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hgetall(session_key(session_id))
+            pipe.smembers(participants_key(session_id))
+            pipe.lrange(questions_key(session_id), 0, -1)
+            header, participants, questions = await pipe.execute()
+
+        if not header:
+            return None
+        return {
+            **_decode_header(header),
+            "participants": sorted(participants),
+            "questions": [json.loads(q) for q in questions],
+        }
+
+    async def get_roster(self, session_id: str) -> Tuple[int, List[str]]:
+        """Get the roster version together with the participants it describes"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hget(session_key(session_id), "roster_version")
+            pipe.smembers(participants_key(session_id))
+            version, participants = await pipe.execute()
+        return int(version or 0), sorted(participants)
+
+    async def get_header(self, session_id: str) -> Optional[Dict]:
+        header = await self.redis.hgetall(session_key(session_id))
+        if not header:
+            session = await self.migrate_legacy(session_id)
+            if session is None:
+                return None
+            header = _encode_header(session)
+        return _decode_header(header)
+
+    async def update_header(self, session_id: str, **fields):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                session_key(session_id),
+                mapping={k: _encode_value(v) for k, v in fields.items()},
+            )
+            self._expire_all(pipe, session_id)
+            await pipe.execute()
+
+    async def write_batch(
+        self,
+        session_id: str,
+        header: Dict,
+        roster: List[Tuple[str, str]],
+    ):
+        """Apply header fields and ``(SADD|SREM, user_id)`` roster changes
+        in one transaction"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if header:
+                pipe.hset(
+                    session_key(session_id),
+                    mapping={k: _encode_value(v) for k, v in header.items()},
+                )
+            for command, user_id in roster:
+                if command == "SADD":
+                    pipe.sadd(participants_key(session_id), user_id)
+                else:
+                    pipe.srem(participants_key(session_id), user_id)
+            self._expire_all(pipe, session_id)
+            await pipe.execute()
+
+    async def get_question(self, session_id: str, index: int) -> Optional[Question]:
+        question = await self.redis.lindex(questions_key(session_id), index)
+        return Question.model_validate_json(question) if question else None
+
+    async def get_participants(self, session_id: str) -> List[str]:
+        return sorted(await self.redis.smembers(participants_key(session_id)))
+
+    async def _change_roster(
+        self, session_id: str, user_id: str, command: str
+    ) -> Optional[int]:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            await self._update_roster(
+                keys=[session_key(session_id), participants_key(session_id)],
+                args=[user_id, command],
+                client=pipe,
+            )
+            self._expire_all(pipe, session_id)
+            version, *_ = await pipe.execute()
+        return None if version is None else int(version)
+
+    async def add_participant(self, session_id: str, user_id: str) -> Optional[int]:
+        """Add a participant and return the new roster version.
+
+        Returns None if the user was already present.
+        """
+        return await self._change_roster(session_id, user_id, "SADD")
+
+    async def remove_participant(
+        self, session_id: str, user_id: str
+    ) -> Optional[int]:
+        """Remove a participant and return the new roster version.
+
+        Returns None if the user was not present.
+        """
+        return await self._change_roster(session_id, user_id, "SREM")
+
+    async def score_answer(
+        self,
+        session_id: str,
+        user_id: str,
+        question_id: str,
+        points: int,
+        is_correct: bool,
+        window: int,
+        option: Optional[str] = None,
+        limit: int = 10,
+    ) -> Dict:
+        """Atomically apply points for an answer to the current question.
+
+        The returned ``status`` is ``missing`` when the session is not in
+        Redis, ``stale`` when ``question_id`` is not the current question and
+        ``duplicate`` when the user already answered it within the last
+        ``window`` seconds, in which case the first outcome is returned.
+        ``option`` is the counter a first answer increments, if any.
+        """
+        result = await self._score_answer(
+            keys=[
+                session_key(session_id),
+                score_key(session_id, user_id),
+                leaderboard_key(session_id),
+                answered_key(session_id, question_id, user_id),
+                distribution_key(session_id, question_id),
+            ],
+            args=[
+                user_id,
+                question_id,
+                points,
+                limit,
+                int(is_correct),
+                window,
+                option or "",
+                self.ttl,
+            ],
+        )
+        if result[0] == "duplicate":
+            _, outcome, top = result
+            correct, first_points, total = outcome.split(":")
+            return {
+                "status": "duplicate",
+                "is_correct": correct == "1",
+                "points": int(first_points),
+                "total_score": int(total),
+                "leaderboard": parse_scores(top),
+            }
+        if result[0] != "ok":
+            return {"status": result[0]}
+
+        _, total, top = result
+        return {
+            "status": "ok",
+            "is_correct": is_correct,
+            "points": points,
+            "total_score": int(total),
+            "leaderboard": parse_scores(top),
+        }
+
+    async def get_ranks(self, session_id: str, user_ids: List[str]) -> List[Dict]:
+        """1-based rank and score of each user, None for users without a score"""
+        key = leaderboard_key(session_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                pipe.zrevrank(key, user_id)
+                pipe.zscore(key, user_id)
+            replies = await pipe.execute()
+
+        ranks = []
+        for i, user_id in enumerate(user_ids):
+            rank, score = replies[2 * i], replies[2 * i + 1]
+            ranks.append(
+                {
+                    "user_id": user_id,
+                    "rank": None if rank is None else rank + 1,
+                    "score": None if score is None else int(score),
+                }
+            )
+        return ranks
+
+    async def get_leaderboard_range(
+        self, session_id: str, offset: int, count: int
+    ) -> Tuple[List[Dict], int]:
+        """Ranked leaderboard entries from ``offset`` and the leaderboard size"""
+        key = leaderboard_key(session_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zrevrange(key, offset, offset + count - 1, withscores=True)
+            pipe.zcard(key)
+            scores, total = await pipe.execute()
+        entries = [
+            {"user_id": user_id, "rank": offset + i + 1, "score": int(score)}
+            for i, (user_id, score) in enumerate(scores)
+        ]
+        return entries, total
+
+    async def get_standings(self, session_id: str) -> List[Dict]:
+        """The whole leaderboard as ranked entries"""
+        scores = await self.redis.zrevrange(
+            leaderboard_key(session_id), 0, -1, withscores=True
+        )
+        return [
+            {"user_id": user_id, "rank": i + 1, "score": int(score)}
+            for i, (user_id, score) in enumerate(scores)
+        ]
+
+    async def get_distributions(
+        self, session_id: str, question_ids: List[str]
+    ) -> Dict[str, Dict[str, int]]:
+        """Option counters of several questions in one round trip"""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for question_id in question_ids:
+                pipe.hgetall(distribution_key(session_id, question_id))
+            replies = await pipe.execute()
+        return {
+            question_id: {option: int(count) for option, count in counts.items()}
+            for question_id, counts in zip(question_ids, replies)
+        }
+
+    async def purge(
+        self,
+        session_id: str,
+        question_ids: List[str],
+        user_ids: List[str],
+        batch_size: int = 500,
+    ):
+        """Unlink every key of a finished session in pipelined batches.
+
+        ``answered:*`` markers are left to expire with their question window.
+        """
+        keys = [
+            session_key(session_id),
+            participants_key(session_id),
+            questions_key(session_id),
+            leaderboard_key(session_id),
+        ]
+        keys.extend(distribution_key(session_id, q) for q in question_ids)
+        keys.extend(score_key(session_id, u) for u in user_ids)
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for start in range(0, len(keys), batch_size):
+                pipe.unlink(*keys[start : start + batch_size])
+            await pipe.execute()
+
+    async def get_distribution(self, session_id: str, question_id: str) -> Dict[str, int]:
+        """Answers counted per option for a question"""
+        counts = await self.redis.hgetall(distribution_key(session_id, question_id))
+        return {option: int(count) for option, count in counts.items()}
+
+    async def migrate_legacy(self, session_id: str) -> Optional[QuizSession]:
+        """Convert a ``quiz_session:{id}`` JSON blob into the normalized layout"""
+        blob = await self.redis.get(legacy_session_key(session_id))
+        if not blob:
+            return None
+
+        session = QuizSession.model_validate_json(blob)
+        await self.save(session)
+        await self.redis.delete(legacy_session_key(session_id))
+        logger.info("Migrated legacy session blob for %s", session_id)
+        return session
+
+    async def migrate_all_legacy(self) -> int:
+        """Migrate every legacy session blob still present in Redis"""
+        migrated = 0
+        prefix = legacy_session_key("")
+        async for key in self.redis.scan_iter(match=f"{prefix}*", count=500):
+            try:
+                if await self.migrate_legacy(key[len(prefix) :]):
+                    migrated += 1
+            except Exception as e:
+                logger.error("Error migrating legacy session %s: %s", key, e)
+        return migrated
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from typing import Callable, Optional
+
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+# Delivers an encoded payload to the local sockets of a session
+DeliverCallback = Callable[[str, str, Optional[str]], None]
+
+
+def channel_name(session_id: str) -> str:
+    return f"ws:session:{session_id}"
+
+
+class RedisBroadcastBackend:
+    """Relays session broadcasts between nodes over Redis pub/sub.
+
+    Every broadcast is published once to the session channel. Each node is
+    subscribed only to the sessions it currently has local sockets for and
+    hands received payloads to the ConnectionManager for local fan-out, so
+    the publishing node receives its own broadcasts the same way.
+    """
+
+    def __init__(self, redis_url: str):
+        self.redis_url = redis_url
+        self.redis: Redis = None
+        self._pubsub = None
+        self._deliver: Optional[DeliverCallback] = None
+        self._subscribed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: DeliverCallback):
+        self._deliver = deliver
+        self.redis = Redis.from_url(self.redis_url, decode_responses=True)
+        self._pubsub = self.redis.pubsub()
+        self._task = asyncio.create_task(self._listen())
+        logger.info("Redis broadcast backend started")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._pubsub is not None:
+            await self._pubsub.close()
+        if self.redis is not None:
+            await self.redis.close()
+
+    async def publish(
+        self, session_id: str, payload: str, exclude_user: Optional[str] = None
+    ):
+        # The excluded user travels on the first line so the payload itself
+        # is forwarded to sockets without being decoded again.
+        await self.redis.publish(
+            channel_name(session_id), f"{exclude_user or ''}\n{payload}"
+        )
+
+    async def subscribe(self, session_id: str):
+        await self._pubsub.subscribe(channel_name(session_id))
+        self._subscribed.set()
+
+    async def unsubscribe(self, session_id: str):
+        await self._pubsub.unsubscribe(channel_name(session_id))
+
+    async def _listen(self):
+        prefix_length = len(channel_name(""))
+        while True:
+            if not self._pubsub.subscribed:
+                self._subscribed.clear()
+                await self._subscribed.wait()
+                continue
+
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+            except Exception as e:
+                logger.error("Error reading from broadcast channel: %s", e)
+                await asyncio.sleep(1)
+                continue
+
+            if message is None or message["type"] != "message":
+                continue
+
+            exclude_user, _, payload = message["data"].partition("\n")
+            try:
+                self._deliver(
+                    message["channel"][prefix_length:], payload, exclude_user or None
+                )
+            except Exception as e:
+                logger.error("Error delivering broadcast: %s", e)
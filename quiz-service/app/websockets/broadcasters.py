@@ -0,0 +1,214 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.websockets.manager import manager
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderboardBroadcaster:
+    """Coalesces leaderboard updates into at most one broadcast per interval.
+
+    Answers only mark their session dirty; a single ticker task reads the
+    leaderboard of every dirty session once per tick and broadcasts a
+    ``leaderboard_update``. With ``deltas`` enabled the message carries just
+    the entries whose rank or score changed since the previous tick.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str, int], Awaitable[List[Dict]]],
+        interval: float = 0.5,
+        limit: int = 10,
+        deltas: bool = True,
+    ):
+        self.fetch = fetch
+        self.interval = interval
+        self.limit = limit
+        self.deltas = deltas
+        self._dirty: Set[str] = set()
+        self._last_sent: Dict[str, Dict[str, tuple]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def mark_dirty(self, session_id: str):
+        self._dirty.add(session_id)
+
+    def forget(self, session_id: str):
+        """Drop state kept for a session that is no longer live"""
+        self._dirty.discard(session_id)
+        self._last_sent.pop(session_id, None)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            if not self._dirty:
+                continue
+
+            dirty, self._dirty = self._dirty, set()
+            for session_id in dirty:
+                try:
+                    await self._flush(session_id)
+                except Exception as e:
+                    logger.error(
+                        "Error broadcasting leaderboard for %s: %s", session_id, e
+                    )
+
+    async def _flush(self, session_id: str):
+        leaderboard = await self.fetch(session_id, self.limit)
+        current = {
+            entry["user_id"]: (rank, entry["score"])
+            for rank, entry in enumerate(leaderboard, start=1)
+        }
+        previous = self._last_sent.get(session_id, {})
+        self._last_sent[session_id] = current
+
+        message = {"type": "leaderboard_update", "session_id": session_id}
+        if self.deltas:
+            changes = [
+                {"user_id": user_id, "rank": rank, "score": score}
+                for user_id, (rank, score) in current.items()
+                if previous.get(user_id) != (rank, score)
+            ]
+            removed = [user_id for user_id in previous if user_id not in current]
+            if not changes and not removed:
+                return
+            message["changes"] = changes
+            message["removed"] = removed
+        else:
+            if current == previous:
+                return
+            message["leaderboard"] = leaderboard
+
+        await manager.broadcast_to_session(session_id, message)
+
+
+class DistributionBroadcaster:
+    """Broadcasts live answer distributions at most once per question per interval"""
+
+    def __init__(
+        self, fetch: Callable[[str, str], Awaitable[Dict]], interval: float = 1.0
+    ):
+        self.fetch = fetch
+        self.interval = interval
+        self._dirty: Set[Tuple[str, str]] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def mark_dirty(self, session_id: str, question_id: str):
+        self._dirty.add((session_id, question_id))
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            if not self._dirty:
+                continue
+
+            dirty, self._dirty = self._dirty, set()
+            for session_id, question_id in dirty:
+                try:
+                    distribution = await self.fetch(session_id, question_id)
+                    await manager.broadcast_to_session(
+                        session_id, {"type": "answer_distribution", **distribution}
+                    )
+                except Exception as e:
+                    logger.error(
+                        "Error broadcasting distribution for %s: %s", session_id, e
+                    )
+
+
+class RosterDeltaBatcher:
+    """Batches participant joins and leaves into periodic ``roster_delta`` messages.
+
+    Every change carries the roster version Redis assigned to it. A delta
+    covers one contiguous run of versions and tells clients the version it
+    applies on top of (``from_version``) and the one it produces
+    (``version``). Clients that see a gap, for example because another node
+    recorded the missing versions, ask for a full ``roster_resync``.
+    """
+
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self._pending: Dict[str, List[tuple]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, session_id: str, user_id: str, joined: bool, version: int):
+        if version <= 0:
+            # The header was gone, clients pick the change up on their next resync
+            return
+        self._pending.setdefault(session_id, []).append((version, user_id, joined))
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            if not self._pending:
+                continue
+
+            pending, self._pending = self._pending, {}
+            for session_id, changes in pending.items():
+                try:
+                    await self._flush(session_id, changes)
+                except Exception as e:
+                    logger.error("Error broadcasting roster for %s: %s", session_id, e)
+
+    async def _flush(self, session_id: str, changes: List[tuple]):
+        changes.sort()
+        runs: List[List[tuple]] = []
+        for change in changes:
+            if runs and change[0] == runs[-1][-1][0] + 1:
+                runs[-1].append(change)
+            else:
+                runs.append([change])
+
+        for run in runs:
+            # Only the last change of each user within a run matters
+            latest = {user_id: joined for _, user_id, joined in run}
+            await manager.broadcast_to_session(
+                session_id,
+                {
+                    "type": "roster_delta",
+                    "session_id": session_id,
+                    "from_version": run[0][0] - 1,
+                    "version": run[-1][0],
+                    "joined": [user for user, joined in latest.items() if joined],
+                    "left": [user for user, joined in latest.items() if not joined],
+                },
+            )
@@ -0,0 +1,245 @@
+import json
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
+
+import msgpack
+from fastapi import WebSocket, WebSocketDisconnect
+
+Payload = Union[str, bytes]
+
+# Compact numeric codes sent instead of message type strings in binary frames
+MESSAGE_CODES: Dict[str, int] = {
+    "session_state": 1,
+    "session_started": 2,
+    "next_question": 3,
+    "quiz_completed": 4,
+    "leaderboard_update": 5,
+    "participant_joined": 6,
+    "participant_left": 7,
+    "connection_closed": 8,
+    "error": 9,
+    "ping": 10,
+    "pong": 11,
+    "answer": 12,
+    "answer_ack": 13,
+    "answer_error": 14,
+    "roster_delta": 15,
+    "roster_resync": 16,
+    "roster_snapshot": 17,
+    "answer_distribution": 18,
+}
+MESSAGE_TYPES: Dict[int, str] = {code: name for name, code in MESSAGE_CODES.items()}
+
+# First byte of every binary frame
+FLAG_RAW = 0
+FLAG_DEFLATE = 1
+
+
+class MalformedMessage(ValueError):
+    """An inbound frame that does not decode to a message object"""
+
+
+def _message(value) -> dict:
+    if not isinstance(value, dict):
+        raise MalformedMessage("Message must be an object")
+    return value
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+class JsonCodec:
+    """Text frames carrying JSON, the default for existing clients"""
+
+    name = "json"
+    subprotocol = "quiz.json.v1"
+    binary = False
+
+    def encode(self, message: dict) -> str:
+        return json.dumps(
+            message, separators=(",", ":"), ensure_ascii=False, default=_default
+        )
+
+    def encode_fields(self, fields: dict) -> str:
+        """Members of ``fields`` as JSON object text, without the braces"""
+        return self.encode(fields)[1:-1] if fields else ""
+
+    def splice(self, kind: str, count: int, encoded: str, fields: dict) -> str:
+        """A message from members encoded earlier plus ``fields``"""
+        extra = self.encode_fields(fields)
+        separator = "," if encoded and extra else ""
+        return "{" + encoded + separator + extra + "}"
+
+    def decode(self, payload: Payload) -> dict:
+        try:
+            return _message(json.loads(payload))
+        except ValueError as e:
+            raise MalformedMessage(str(e)) from e
+
+
+JSON_CODEC = JsonCodec()
+
+
+class MsgpackCodec:
+    """Binary frames carrying MessagePack with numeric message types.
+
+    Each frame starts with a flag byte; bodies of message types whose
+    encoded size reaches their threshold are deflated. Only outbound
+    frames are compressed: inbound deflated frames are refused, since
+    inflating client data unbounded would let one frame exhaust memory.
+    """
+
+    name = "msgpack"
+    subprotocol = "quiz.msgpack.v1"
+    binary = True
+
+    def __init__(self, compression_thresholds: Optional[Dict[str, int]] = None):
+        thresholds = dict(compression_thresholds or {})
+        self.default_threshold = thresholds.pop("default", 0)
+        self.thresholds = thresholds
+
+    def encode(self, message: dict) -> bytes:
+        kind = message.get("type")
+        if kind in MESSAGE_CODES:
+            message = {**message, "type": MESSAGE_CODES[kind]}
+        return self._frame(kind, msgpack.packb(message, default=_default))
+
+    def encode_fields(self, fields: dict) -> bytes:
+        """Key and value pairs of ``fields`` without the map header"""
+        packer = msgpack.Packer(default=_default)
+        parts = []
+        for key, value in fields.items():
+            if key == "type" and value in MESSAGE_CODES:
+                value = MESSAGE_CODES[value]
+            parts.append(packer.pack(key))
+            parts.append(packer.pack(value))
+        return b"".join(parts)
+
+    def splice(self, kind: str, count: int, encoded: bytes, fields: dict) -> bytes:
+        """A message from ``count`` pairs encoded earlier plus ``fields``"""
+        header = msgpack.Packer().pack_map_header(count + len(fields))
+        return self._frame(kind, header + encoded + self.encode_fields(fields))
+
+    def _frame(self, kind: Optional[str], body: bytes) -> bytes:
+        threshold = self.thresholds.get(kind, self.default_threshold)
+        if threshold and len(body) >= threshold:
+            return bytes([FLAG_DEFLATE]) + zlib.compress(body)
+        return bytes([FLAG_RAW]) + body
+
+    def decode(self, payload: Payload) -> dict:
+        if isinstance(payload, str):
+            # Tolerate JSON text frames from clients that negotiated msgpack
+            return JSON_CODEC.decode(payload)
+        if not payload:
+            raise MalformedMessage("Empty frame")
+        if payload[0] != FLAG_RAW:
+            raise MalformedMessage("Compressed or unknown frames are not accepted")
+        try:
+            message = _message(msgpack.unpackb(payload[1:]))
+        except MalformedMessage:
+            raise
+        except Exception as e:
+            raise MalformedMessage("Invalid msgpack frame") from e
+        kind = message.get("type")
+        if isinstance(kind, int):
+            message["type"] = MESSAGE_TYPES.get(kind, kind)
+        return message
+
+
+Codec = Union[JsonCodec, MsgpackCodec]
+
+
+def negotiate_codec(
+    websocket: WebSocket, codecs: List[Codec]
+) -> Tuple[Codec, Optional[str]]:
+    """Pick the first codec whose subprotocol the client offered.
+
+    Returns the codec and the subprotocol to accept the handshake with,
+    which is None for clients that offered none of ours.
+    """
+    offered = websocket.scope.get("subprotocols") or []
+    for codec in codecs:
+        if codec.subprotocol in offered:
+            return codec, codec.subprotocol
+    return JSON_CODEC, None
+
+
+async def receive_message(websocket: WebSocket, codec: Codec) -> dict:
+    """Receive and decode one message.
+
+    Raises WebSocketDisconnect on close and MalformedMessage for frames
+    that do not decode to a message object.
+    """
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    payload = message.get("bytes")
+    if payload is None:
+        payload = message.get("text")
+    if payload is None:
+        raise MalformedMessage("Empty frame")
+    return codec.decode(payload)
+
+
+class EncodedMessage:
+    """A message serialized lazily and at most once per codec"""
+
+    def __init__(
+        self,
+        message: Optional[dict] = None,
+        payload: Optional[str] = None,
+        template: Optional["MessageTemplate"] = None,
+        fields: Optional[dict] = None,
+    ):
+        self._message = message
+        self._payloads: Dict[str, Payload] = {}
+        self._template = template
+        self._fields = fields or {}
+        if payload is not None:
+            self._payloads[JSON_CODEC.name] = payload
+
+    @property
+    def message(self) -> dict:
+        if self._message is None:
+            if self._template is not None:
+                self._message = {**self._template.message, **self._fields}
+            else:
+                self._message = JSON_CODEC.decode(self._payloads[JSON_CODEC.name])
+        return self._message
+
+    def for_codec(self, codec: Codec) -> Payload:
+        payload = self._payloads.get(codec.name)
+        if payload is None:
+            if self._template is not None:
+                payload = self._template.splice(codec, self._fields)
+            else:
+                payload = codec.encode(self.message)
+            self._payloads[codec.name] = payload
+        return payload
+
+
+class MessageTemplate:
+    """The fields of a message that stay the same across many sends.
+
+    They are encoded at most once per codec; each rendered message only
+    encodes the fields passed to ``render`` and splices them in.
+    """
+
+    def __init__(self, message: dict):
+        self.message = message
+        self._encoded: Dict[str, Payload] = {}
+
+    def render(self, **fields) -> EncodedMessage:
+        return EncodedMessage(template=self, fields=fields)
+
+    def splice(self, codec: Codec, fields: dict) -> Payload:
+        encoded = self._encoded.get(codec.name)
+        if encoded is None:
+            encoded = self._encoded[codec.name] = codec.encode_fields(self.message)
+        return codec.splice(
+            self.message.get("type"), len(self.message), encoded, fields
+        )
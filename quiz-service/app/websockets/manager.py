@@ -1,114 +1,333 @@
 import logging
 import asyncio
-from typing import Dict, Set, Optional
+import time
+from typing import Dict, List, Set, Optional, Union
 from fastapi import WebSocket, status
 from starlette.websockets import WebSocketState
 
+from app.core.config import get_settings
+from app.core.metrics import BROADCAST_FANOUT, BROADCAST_LATENCY
+from app.websockets.backend import RedisBroadcastBackend
+from app.websockets.codec import (
+    JSON_CODEC,
+    Codec,
+    EncodedMessage,
+    MsgpackCodec,
+    Payload,
+)
+
 logger = logging.getLogger(__name__)
 
+# Queued to a connection's writer to make it exit after sending what precedes it
+_CLOSE = object()
+
+
+class Connection:
+    """A WebSocket with a bounded outbound queue drained by its own writer task"""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        user_id: str,
+        max_queue_size: int,
+        codec: Codec = JSON_CODEC,
+    ):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.codec = codec
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._writer = asyncio.create_task(self._write_loop())
+        self.closing = False
+
+    def send(self, payload: Payload) -> bool:
+        """Queue an encoded payload, returns False if the queue is full"""
+        if self.closing or self._writer.done():
+            return False
+        try:
+            self._queue.put_nowait(payload)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def close(self, code: int = status.WS_1000_NORMAL_CLOSURE, timeout=1.0):
+        """Let the writer flush queued messages, then close the socket"""
+        self.closing = True
+        try:
+            self._queue.put_nowait(_CLOSE)
+            await asyncio.wait_for(asyncio.shield(self._writer), timeout)
+        except (asyncio.QueueFull, asyncio.TimeoutError):
+            pass
+        self._writer.cancel()
+        if self.websocket.application_state != WebSocketState.DISCONNECTED:
+            await self.websocket.close(code=code)
+
+    def abort(self):
+        """Stop the writer without waiting for queued messages"""
+        self.closing = True
+        self._writer.cancel()
+
+    async def _write_loop(self):
+        while True:
+            payload = await self._queue.get()
+            if payload is _CLOSE:
+                return
+            try:
+                if self.websocket.application_state == WebSocketState.DISCONNECTED:
+                    return
+                if isinstance(payload, bytes):
+                    await self.websocket.send_bytes(payload)
+                else:
+                    await self.websocket.send_text(payload)
+            except Exception as e:
+                logger.error("Error sending message to user %s: %s", self.user_id, e)
+                return
+
 
 class ConnectionManager:
-    def __init__(self):
-        self._active_connections: Dict[str, Dict[str, list[WebSocket]]] = {}
-        self._lock = asyncio.Lock()
+    def __init__(
+        self,
+        max_queue_size: int = 256,
+        lock_stripes: int = 64,
+        codecs: Optional[List[Codec]] = None,
+    ):
+        self._active_connections: Dict[str, Dict[str, list[Connection]]] = {}
+        self._connections: Dict[WebSocket, Connection] = {}
+        # Joins and leaves only serialize with others hashing to the same stripe
+        self._locks = [asyncio.Lock() for _ in range(lock_stripes)]
+        self.max_queue_size = max_queue_size
+        self.backend: Optional[RedisBroadcastBackend] = None
+        # Wire formats clients may negotiate, in order of preference
+        self.codecs: List[Codec] = codecs if codecs is not None else [JSON_CODEC]
+
+    def _lock_for(self, session_id: str) -> asyncio.Lock:
+        return self._locks[hash(session_id) % len(self._locks)]
+
+    async def start_backend(self, backend: RedisBroadcastBackend):
+        """Route broadcasts through a cross-node backend"""
+        await backend.start(self._deliver_local)
+        self.backend = backend
+        for session_id in list(self._active_connections):
+            async with self._lock_for(session_id):
+                if session_id in self._active_connections:
+                    await backend.subscribe(session_id)
+
+    async def stop_backend(self):
+        if self.backend is not None:
+            backend, self.backend = self.backend, None
+            await backend.stop()
 
-    async def connect(self, websocket: WebSocket, session_id: str, user_id: str):
+    async def connect(
+        self,
+        websocket: WebSocket,
+        session_id: str,
+        user_id: str,
+        codec: Codec = JSON_CODEC,
+    ):
         """Connect a user to a session"""
-        async with self._lock:
+        async with self._lock_for(session_id):
             try:
-                logger.info(
-                    f"Adding connection for user {user_id} in session {session_id}"
+                logger.debug(
+                    "Adding connection for user %s in session %s", user_id, session_id
                 )
 
                 if session_id not in self._active_connections:
                     self._active_connections[session_id] = {}
+                    if self.backend is not None:
+                        await self.backend.subscribe(session_id)
 
-                if user_id not in self._active_connections[session_id]:
-                    self._active_connections[session_id][user_id] = []
-
-                for existing_ws in self._active_connections[session_id][user_id]:
-                    try:
-                        if existing_ws.application_state != WebSocketState.DISCONNECTED:
-                            await existing_ws.send_json(
-                                {
-                                    "type": "connection_closed",
-                                    "reason": "New connection established from another location",
-                                }
-                            )
-                            await existing_ws.close(
-                                code=status.WS_1008_POLICY_VIOLATION
-                            )
-                    except Exception as e:
-                        logger.error(f"Error closing existing connection: {e}")
+                replaced = self._active_connections[session_id].get(user_id, [])
+                for existing in replaced:
+                    self._connections.pop(existing.websocket, None)
 
-                self._active_connections[session_id][user_id] = [websocket]
-                logger.info(f"User {user_id} connected to session {session_id}")
+                connection = Connection(
+                    websocket, user_id, self.max_queue_size, codec
+                )
+                self._connections[websocket] = connection
+                self._active_connections[session_id][user_id] = [connection]
+                logger.info("User %s connected to session %s", user_id, session_id)
 
             except Exception as e:
-                logger.error(f"Error connecting user {user_id}: {e}")
+                logger.error("Error connecting user %s: %s", user_id, e)
                 raise
 
+        # Closing replaced sockets waits on the network, keep it out of the lock
+        for existing in replaced:
+            try:
+                existing.send(
+                    existing.codec.encode(
+                        {
+                            "type": "connection_closed",
+                            "reason": "New connection established from another location",
+                        }
+                    )
+                )
+                await existing.close(code=status.WS_1008_POLICY_VIOLATION)
+            except Exception as e:
+                logger.error("Error closing existing connection: %s", e)
+
     async def disconnect(self, websocket: WebSocket, session_id: str, user_id: str):
         """Disconnect a user's WebSocket connection"""
-        async with self._lock:
+        async with self._lock_for(session_id):
             try:
-                logger.info(
-                    f"Removing connection for user {user_id} from session {session_id}"
+                logger.debug(
+                    "Removing connection for user %s from session %s",
+                    user_id,
+                    session_id,
                 )
 
+                connection = self._connections.pop(websocket, None)
+                if connection is not None:
+                    connection.abort()
+
                 if session_id in self._active_connections:
                     if user_id in self._active_connections[session_id]:
                         self._active_connections[session_id][user_id] = [
-                            ws
-                            for ws in self._active_connections[session_id][user_id]
-                            if ws != websocket
+                            conn
+                            for conn in self._active_connections[session_id][user_id]
+                            if conn.websocket != websocket
                         ]
 
                         if not self._active_connections[session_id][user_id]:
                             logger.info(
-                                f"User {user_id} has no more connections, removing from session {session_id}"
+                                "User %s has no more connections to session %s",
+                                user_id,
+                                session_id,
                             )
                             del self._active_connections[session_id][user_id]
 
                             if not self._active_connections[session_id]:
                                 del self._active_connections[session_id]
+                                if self.backend is not None:
+                                    await self.backend.unsubscribe(session_id)
 
                             return True
 
                 return False
 
             except Exception as e:
-                logger.error(f"Error disconnecting user {user_id}: {e}")
+                logger.error("Error disconnecting user %s: %s", user_id, e)
                 return False
 
     def get_user_connection_count(self, session_id: str, user_id: str) -> int:
         """Get number of active connections for a user"""
         return len(self._active_connections.get(session_id, {}).get(user_id, []))
 
+    async def send_personal(
+        self, websocket: WebSocket, message: Union[dict, EncodedMessage]
+    ) -> bool:
+        """Send a message to one socket, ordered with its broadcasts.
+
+        An EncodedMessage reuses whatever encoding it already holds for the
+        socket's codec.
+        """
+        connection = self._connections.get(websocket)
+        if isinstance(message, EncodedMessage):
+            if connection is None:
+                await websocket.send_text(message.for_codec(JSON_CODEC))
+                return True
+            payload = message.for_codec(connection.codec)
+        else:
+            if connection is None:
+                await websocket.send_json(message)
+                return True
+            payload = connection.codec.encode(message)
+        if not connection.send(payload):
+            self._evict(connection)
+            return False
+        return True
+
     async def broadcast_to_session(
         self, session_id: str, message: dict, exclude_user: Optional[str] = None
     ):
         """Broadcast a message to all users in a session"""
+        if self.backend is None and session_id not in self._active_connections:
+            return
+
+        encoded = EncodedMessage(message)
+        if self.backend is not None:
+            await self.backend.publish(
+                session_id, encoded.for_codec(JSON_CODEC), exclude_user
+            )
+        else:
+            self._deliver_local(session_id, encoded, exclude_user)
+
+    def _deliver_local(
+        self,
+        session_id: str,
+        message: Union[str, EncodedMessage],
+        exclude_user: Optional[str] = None,
+    ):
+        """Queue a message for every local socket of a session.
+
+        ``message`` is either an EncodedMessage or a JSON payload relayed by
+        the backend; it is serialized at most once per codec in use.
+        """
         if session_id not in self._active_connections:
             return
 
+        encoded = (
+            message
+            if isinstance(message, EncodedMessage)
+            else EncodedMessage(payload=message)
+        )
+
+        started = time.perf_counter()
+        recipients = 0
+        slow_consumers = []
         for user_id, connections in self._active_connections[session_id].items():
             if exclude_user and user_id == exclude_user:
                 continue
 
+            recipients += len(connections)
             for connection in connections:
-                try:
-                    if connection.application_state != WebSocketState.DISCONNECTED:
-                        await connection.send_json(message)
-                except Exception as e:
-                    logger.error(f"Error sending message to user {user_id}: {e}")
-                    asyncio.create_task(
-                        self.disconnect(connection, session_id, user_id)
-                    )
+                if not connection.send(encoded.for_codec(connection.codec)):
+                    slow_consumers.append(connection)
+
+        BROADCAST_FANOUT.observe(recipients)
+        BROADCAST_LATENCY.observe(time.perf_counter() - started)
+
+        for connection in slow_consumers:
+            self._evict(connection)
+
+    def _evict(self, connection: Connection):
+        """Close a connection whose outbound queue overflowed.
+
+        The socket's own endpoint observes the close and runs the regular
+        disconnect path, so the registry is not touched here.
+        """
+        if connection.closing:
+            return
+        logger.warning(
+            "Evicting slow consumer %s, outbound queue is full", connection.user_id
+        )
+        asyncio.create_task(connection.close(code=status.WS_1013_TRY_AGAIN_LATER))
+
+    def get_session_count(self) -> int:
+        """Get number of sessions with local connections"""
+        return len(self._active_connections)
+
+    def get_connection_count(self) -> int:
+        """Get number of local WebSocket connections"""
+        return sum(
+            len(connections)
+            for users in self._active_connections.values()
+            for connections in users.values()
+        )
 
     def get_session_participants(self, session_id: str) -> Set[str]:
         """Get all participants in a session"""
         return set(self._active_connections.get(session_id, {}).keys())
 
 
-manager = ConnectionManager()
+def _configured_codecs() -> List[Codec]:
+    settings = get_settings()
+    codecs: List[Codec] = []
+    if settings.WS_MSGPACK_ENABLED:
+        codecs.append(MsgpackCodec(settings.WS_COMPRESSION_THRESHOLDS))
+    codecs.append(JSON_CODEC)
+    return codecs
+
+
+manager = ConnectionManager(
+    max_queue_size=get_settings().WS_SEND_QUEUE_SIZE, codecs=_configured_codecs()
+)
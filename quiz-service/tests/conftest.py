@@ -0,0 +1,35 @@
+import fakeredis
+import pytest_asyncio
+from app.services.answer_writer import AnswerWriter
+from app.services.quiz_service import QuizService
+from app.utils.redis_utils import SessionStore
+from mongomock_motor import AsyncMongoMockClient
+
+
+@pytest_asyncio.fixture
+async def redis():
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    yield client
+    await client.aclose()
+
+
+@pytest_asyncio.fixture
+async def store(redis):
+    return SessionStore(redis, ttl=60)
+
+
+@pytest_asyncio.fixture
+async def answers_collection():
+    return AsyncMongoMockClient()["quiz_test"]["answers"]
+
+
+@pytest_asyncio.fixture
+async def service(redis, store):
+    """QuizService on fakeredis and mongomock-motor, without background tasks"""
+    quiz_service = QuizService()
+    quiz_service.redis = redis
+    quiz_service.sessions = store
+    quiz_service.mongodb = AsyncMongoMockClient()
+    quiz_service.db = quiz_service.mongodb["quiz_test"]
+    quiz_service.answer_writer = AnswerWriter(quiz_service.db.answers)
+    return quiz_service
@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import List
+
+from app.models.quiz import Question, Quiz, QuizSession
+
+
+def make_questions(count: int = 2) -> List[Question]:
+    return [
+        Question(
+            id=f"q{i}",
+            text="Pick one",
+            type="multiple_choice",
+            options=["a", "b", "c"],
+            correct_answer="a",
+            points=10,
+            time_limit=30,
+        )
+        for i in range(count)
+    ]
+
+
+def make_quiz() -> Quiz:
+    return Quiz(title="Quiz", description="Test quiz", questions=make_questions())
+
+
+def make_session(
+    status: str = "active",
+    current_question: int = 0,
+    participants: List[str] = ("u1", "u2"),
+    session_id: str = "s1",
+    quiz_id: str = "quiz1",
+) -> QuizSession:
+    return QuizSession(
+        id=session_id,
+        quiz_id=quiz_id,
+        status=status,
+        current_question=current_question,
+        questions=make_questions(),
+        start_time=datetime(2024, 1, 1),
+        participants=list(participants),
+    )
@@ -0,0 +1,347 @@
+"""End-to-end load harness for the REST + WebSocket quiz flow.
+
+Runs the FastAPI app in process behind uvicorn, connects N WebSocket
+participants to one session and submits answers at a fixed rate. Redis and
+MongoDB are replaced by in-memory stand-ins (fakeredis, mongomock-motor)
+unless ``--real-backends`` is given, in which case the servers configured
+in the environment (REDIS_URL, MONGODB_HOST, ...) are used.
+
+    python -m tests.load.harness --participants 500 --rate 200 --duration 20
+
+Prints a JSON report (and writes it to ``--report`` when given) with
+p50/p95/p99 latencies, message throughput and peak RSS. Client and server
+share the process, so RSS and CPU include both sides.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import resource
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+import websockets
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"count": 0, "p50": None, "p95": None, "p99": None, "max": None}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+    return {
+        "count": len(ordered),
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def install_stand_ins():
+    """Point QuizService at in-memory Redis and MongoDB replacements"""
+    import fakeredis
+    from mongomock_motor import AsyncMongoMockClient
+
+    from app.services import quiz_service
+    from app.websockets import backend
+
+    server = fakeredis.FakeServer()
+    mongo = AsyncMongoMockClient()
+
+    class FakeRedisFactory:
+        @staticmethod
+        def from_url(url, decode_responses=False, **kwargs):
+            return fakeredis.aioredis.FakeRedis(
+                server=server, decode_responses=decode_responses
+            )
+
+    quiz_service.InstrumentedRedis = FakeRedisFactory
+    backend.Redis = FakeRedisFactory
+    quiz_service.AsyncIOMotorClient = lambda url, **kwargs: mongo
+
+
+class Participant:
+    def __init__(self, user_id: str, run: "LoadRun"):
+        self.user_id = user_id
+        self.run = run
+        self.socket = None
+        self.reader: Optional[asyncio.Task] = None
+        self.pending_scores: Dict[int, float] = {}
+        self.pending_answers: Dict[int, float] = {}
+        self.answer_seq = 0
+
+    async def connect(self, url: str):
+        self.socket = await websockets.connect(url, max_queue=None)
+        self.reader = asyncio.create_task(self._read())
+
+    async def close(self):
+        if self.socket is not None:
+            await self.socket.close()
+        if self.reader is not None:
+            await asyncio.gather(self.reader, return_exceptions=True)
+
+    async def _read(self):
+        try:
+            async for raw in self.socket:
+                received = time.perf_counter()
+                self.run.messages += 1
+                message = json.loads(raw)
+                self.run.on_message(self, message, received)
+        except websockets.ConnectionClosed:
+            pass
+
+
+class LoadRun:
+    def __init__(self, args: argparse.Namespace, base_url: str):
+        self.args = args
+        self.base_url = base_url
+        self.ws_url = base_url.replace("http", "ws", 1)
+        self.participants: List[Participant] = []
+        self.session_id: Optional[str] = None
+        self.current_question: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.messages = 0
+        self.errors: Dict[str, int] = {}
+        self.submit_latency: List[float] = []
+        self.broadcast_latency: List[float] = []
+        self.score_visible_latency: List[float] = []
+
+    def on_message(self, participant: Participant, message: Dict, received: float):
+        kind = message.get("type")
+        if kind == "session_started":
+            self.current_question = message["current_question"]["id"]
+            if self.started_at is not None:
+                self.broadcast_latency.append((received - self.started_at) * 1000)
+        elif kind == "next_question":
+            self.current_question = message["question"]["id"]
+        elif kind in ("answer_ack", "answer_error"):
+            started = participant.pending_answers.pop(message["id"], None)
+            if started is None:
+                return
+            self.submit_latency.append((received - started) * 1000)
+            if kind == "answer_error":
+                self.record_error(f"ws_{message['status_code']}")
+            elif message.get("points"):
+                participant.pending_scores[message["total_score"]] = started
+        elif kind == "leaderboard_update":
+            for entry in message.get("changes") or message.get("leaderboard") or []:
+                if entry["user_id"] != participant.user_id:
+                    continue
+                submitted = participant.pending_scores.pop(entry["score"], None)
+                if submitted is not None:
+                    self.score_visible_latency.append((received - submitted) * 1000)
+
+    def record_error(self, kind: str):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    async def setup(self, client: httpx.AsyncClient):
+        questions = [
+            {
+                "id": f"q{i}",
+                "text": f"Question {i}",
+                "type": "multiple_choice",
+                "options": ["a", "b", "c", "d"],
+                "correct_answer": "a",
+                "points": 10,
+                "time_limit": self.args.question_time_limit,
+            }
+            for i in range(self.args.questions)
+        ]
+        quiz = await client.post(
+            "/api/v1/quizzes/",
+            json={"title": "Load test", "description": "", "questions": questions},
+        )
+        quiz.raise_for_status()
+        session = await client.post(
+            "/api/v1/quizzes/sessions", params={"quiz_id": quiz.json()["_id"]}
+        )
+        session.raise_for_status()
+        self.session_id = session.json()["id"]
+
+        semaphore = asyncio.Semaphore(self.args.connect_concurrency)
+
+        async def join(index: int):
+            participant = Participant(f"user_{index}", self)
+            async with semaphore:
+                await participant.connect(
+                    f"{self.ws_url}/api/v1/quizzes/sessions/"
+                    f"{self.session_id}/ws/{participant.user_id}"
+                )
+            self.participants.append(participant)
+
+        await asyncio.gather(*(join(i) for i in range(self.args.participants)))
+
+    async def start(self, client: httpx.AsyncClient):
+        self.started_at = time.perf_counter()
+        response = await client.post(
+            f"/api/v1/quizzes/sessions/{self.session_id}/start"
+        )
+        response.raise_for_status()
+
+    async def submit(self, client: httpx.AsyncClient, participant: Participant):
+        question_id = self.current_question
+        answer = "a" if random.random() < self.args.correct_ratio else "b"
+        started = time.perf_counter()
+        if self.args.submit_over == "ws":
+            participant.answer_seq += 1
+            participant.pending_answers[participant.answer_seq] = started
+            await participant.socket.send(
+                json.dumps(
+                    {
+                        "type": "answer",
+                        "id": participant.answer_seq,
+                        "question_id": question_id,
+                        "answer": answer,
+                    }
+                )
+            )
+            return
+
+        try:
+            response = await client.post(
+                f"/api/v1/quizzes/sessions/{self.session_id}/submit",
+                json={
+                    "session_id": self.session_id,
+                    "question_id": question_id,
+                    "user_id": participant.user_id,
+                    "answer": answer,
+                },
+            )
+        except httpx.HTTPError as e:
+            self.record_error(type(e).__name__)
+            return
+
+        self.submit_latency.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            self.record_error(f"http_{response.status_code}")
+            return
+        body = response.json()
+        if body.get("points"):
+            participant.pending_scores[body["total_score"]] = started
+
+    async def answer_load(self, client: httpx.AsyncClient):
+        interval = 1 / self.args.rate
+        deadline = time.perf_counter() + self.args.duration
+        in_flight = set()
+        next_at = time.perf_counter()
+        while next_at < deadline:
+            participant = random.choice(self.participants)
+            task = asyncio.create_task(self.submit(client, participant))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+            next_at += interval
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+        if in_flight:
+            await asyncio.wait(in_flight)
+
+    async def execute(self) -> Dict:
+        limits = httpx.Limits(max_connections=self.args.http_connections)
+        async with httpx.AsyncClient(
+            base_url=self.base_url, limits=limits, timeout=30
+        ) as client:
+            await self.setup(client)
+            await self.start(client)
+            await asyncio.sleep(0.5)
+
+            messages_before = self.messages
+            load_started = time.perf_counter()
+            await self.answer_load(client)
+            load_elapsed = time.perf_counter() - load_started
+            # Let coalesced broadcasts for the last answers arrive
+            await asyncio.sleep(self.args.drain)
+            elapsed = time.perf_counter() - load_started
+
+        await asyncio.gather(*(p.close() for p in self.participants))
+        return {
+            "config": vars(self.args),
+            "duration_s": round(elapsed, 3),
+            "submit_latency_ms": percentiles(self.submit_latency),
+            "broadcast_latency_ms": percentiles(self.broadcast_latency),
+            "score_visible_latency_ms": percentiles(self.score_visible_latency),
+            "submits_per_second": round(len(self.submit_latency) / load_elapsed, 1),
+            "messages_received": self.messages - messages_before,
+            "messages_per_second": round(
+                (self.messages - messages_before) / elapsed, 1
+            ),
+            "errors": self.errors,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+
+async def serve_and_run(args: argparse.Namespace) -> Dict:
+    import uvicorn
+
+    from app.main import app
+
+    config = uvicorn.Config(
+        app, host="127.0.0.1", port=args.port, log_level="warning", lifespan="on"
+    )
+    server = uvicorn.Server(config)
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        if serving.done():
+            serving.result()
+        await asyncio.sleep(0.05)
+
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        return await LoadRun(args, f"http://127.0.0.1:{port}").execute()
+    finally:
+        server.should_exit = True
+        await serving
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--participants", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=100, help="answers per second")
+    parser.add_argument("--duration", type=float, default=10, help="seconds")
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--question-time-limit", type=int, default=30)
+    parser.add_argument(
+        "--submit-over",
+        choices=["http", "ws"],
+        default="http",
+        help="send answers as HTTP POSTs or as WebSocket answer messages",
+    )
+    parser.add_argument("--correct-ratio", type=float, default=0.7)
+    parser.add_argument("--connect-concurrency", type=int, default=50)
+    parser.add_argument("--http-connections", type=int, default=100)
+    parser.add_argument("--drain", type=float, default=2.0, help="seconds")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument(
+        "--real-backends",
+        action="store_true",
+        help="use the configured Redis and MongoDB instead of in-memory stand-ins",
+    )
+    parser.add_argument("--report", help="also write the JSON report to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    if not args.real_backends:
+        install_stand_ins()
+
+    report = asyncio.run(serve_and_run(args))
+    output = json.dumps(report, indent=2)
+    if args.report:
+        with open(args.report, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+
+import pytest
+from app.services.analytics import AnswerColumns, summarize
+
+START = datetime(2024, 1, 1)
+QUESTIONS = [
+    {"id": "q0", "options": ["a", "b", "c"]},
+    {"id": "q1", "options": ["yes", "no"]},
+]
+
+
+def answer(user_id, question_id, value, correct, points, seconds):
+    return {
+        "user_id": user_id,
+        "question_id": question_id,
+        "answer": value,
+        "is_correct": correct,
+        "points": points,
+        "timestamp": START + timedelta(seconds=seconds),
+    }
+
+
+def test_summary_per_question_and_scores():
+    columns = AnswerColumns(QUESTIONS, participants=["u1", "u2", "u3", "idle"])
+    for document in (
+        answer("u1", "q0", "a", True, 10, 2),
+        answer("u2", "q0", "b", False, 0, 4),
+        answer("u3", "q0", "free text", False, 0, 6),
+        answer("u1", "q1", "yes", True, 5, 61),
+        answer("u2", "q1", "yes", True, 5, 63),
+        answer("u1", "unknown", "a", True, 99, 1),
+    ):
+        columns.append(document)
+
+    stats = summarize(columns, {0: START, 1: START + timedelta(seconds=60)})
+
+    assert stats["answers"] == 5
+    assert stats["participants"] == 4
+    q0, q1 = stats["questions"]
+    assert q0["answers"] == 3
+    assert q0["correct"] == 1
+    assert q0["accuracy"] == 0.333
+    assert q0["distribution"] == {"a": 1, "b": 1, "c": 0}
+    assert q0["other"] == 1
+    assert q0["time_to_answer"] == {"mean": 4.0, "max": 6.0, "p50": 4.0, "p90": 5.6}
+    assert q1["distribution"] == {"yes": 2, "no": 0}
+    assert q1["time_to_answer"]["mean"] == 2.0
+    # Totals are u1=15, u2=5, u3=0, idle=0
+    assert stats["scores"]["mean"] == 5.0
+    assert stats["scores"]["max"] == 15.0
+    assert stats["scores"]["p50"] == 2.5
+
+
+def test_questions_without_answers_or_start_times():
+    columns = AnswerColumns(QUESTIONS)
+    columns.append(answer("u1", "q1", "no", False, 0, 5))
+
+    stats = summarize(columns, {})
+
+    q0, q1 = stats["questions"]
+    assert q0["answers"] == 0
+    assert q0["accuracy"] is None
+    assert q0["time_to_answer"] is None
+    assert q1["accuracy"] == 0.0
+    assert q1["time_to_answer"] is None
+
+
+def test_no_answers_and_no_participants():
+    stats = summarize(AnswerColumns(QUESTIONS), {})
+
+    assert stats["answers"] == 0
+    assert stats["scores"] is None
+
+
+def test_repeated_option_is_counted_once():
+    columns = AnswerColumns([{"id": "q0", "options": ["a", "a", "b"]}])
+    columns.append(answer("u1", "q0", "a", True, 1, 1))
+
+    (question,) = summarize(columns, {})["questions"]
+
+    assert question["distribution"] == {"a": 1, "b": 0}
+    assert question["other"] == 0
+
+
+@pytest.mark.asyncio
+async def test_compute_session_stats_stores_the_summary(service):
+    await service.db.sessions.insert_one(
+        {
+            "id": "s1",
+            "quiz_id": "quiz1",
+            "questions": QUESTIONS,
+            "participants": ["u1", "u2"],
+            "question_started_at": {"0": START},
+        }
+    )
+    await service.answer_writer.put(
+        {"session_id": "s1", **answer("u1", "q0", "a", True, 10, 3)}
+    )
+
+    stats = await service.compute_session_stats("s1")
+
+    stored = await service.db.session_stats.find_one({"session_id": "s1"})
+    assert stored["questions"][0]["time_to_answer"]["mean"] == 3.0
+    assert stats["scores"] == stored["scores"]
+    assert service.session_stats.get("s1") is stats
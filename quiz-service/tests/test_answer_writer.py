@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+from app.services.answer_writer import AnswerWriter
+from pymongo.errors import AutoReconnect
+
+
+def answers(count: int, start: int = 0) -> list:
+    return [{"user_id": f"u{i}", "answer": "a"} for i in range(start, start + count)]
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_queued_and_collecting_documents(answers_collection):
+    writer = AnswerWriter(answers_collection, batch_size=100, flush_interval=60)
+    writer.start()
+    for document in answers(5):
+        await writer.put(document)
+    # Let the background writer take some of them into its batch
+    await asyncio.sleep(0)
+    for document in answers(5, start=5):
+        await writer.put(document)
+
+    await writer.flush()
+
+    assert await answers_collection.count_documents({}) == 10
+    assert writer.queue_depth == 0
+    assert writer.stats()["written"] == 10
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_flush_splits_into_batches(answers_collection):
+    writer = AnswerWriter(answers_collection, batch_size=3)
+    for document in answers(7):
+        await writer.put(document)
+
+    await writer.flush()
+
+    assert await answers_collection.count_documents({}) == 7
+    assert writer.stats()["flushes"] == 3
+
+
+@pytest.mark.asyncio
+async def test_flush_waits_for_the_background_write(answers_collection):
+    writer = AnswerWriter(answers_collection, batch_size=2, flush_interval=60)
+    writer.start()
+    for document in answers(2):
+        await writer.put(document)
+    await asyncio.sleep(0)
+
+    await writer.flush()
+
+    assert await answers_collection.count_documents({}) == 2
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_drains_everything_queued(answers_collection):
+    writer = AnswerWriter(answers_collection, batch_size=4, flush_interval=60)
+    writer.start()
+    for document in answers(10):
+        await writer.put(document)
+
+    await writer.stop()
+
+    assert await answers_collection.count_documents({}) == 10
+    assert writer.queue_depth == 0
+    assert writer.stats()["failed"] == 0
+
+
+class FlakyCollection:
+    """Fails the first ``failures`` inserts with a transient error"""
+
+    def __init__(self, collection, failures: int):
+        self.collection = collection
+        self.failures = failures
+
+    async def insert_many(self, documents, ordered=True):
+        if self.failures:
+            self.failures -= 1
+            raise AutoReconnect("connection reset")
+        return await self.collection.insert_many(documents, ordered=ordered)
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried(answers_collection):
+    writer = AnswerWriter(
+        FlakyCollection(answers_collection, failures=2), retry_backoff=0.001
+    )
+    for document in answers(3):
+        await writer.put(document)
+
+    await writer.flush()
+
+    assert await answers_collection.count_documents({}) == 3
+    assert writer.stats()["failed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_stopping_writer_gives_up_on_transient_failures(answers_collection):
+    writer = AnswerWriter(
+        FlakyCollection(answers_collection, failures=100), retry_backoff=0.001
+    )
+    for document in answers(3):
+        await writer.put(document)
+
+    await writer.stop()
+
+    assert writer.stats()["failed"] == 3
@@ -0,0 +1,127 @@
+import pytest
+import pytest_asyncio
+from app.models.quiz import Answer
+from app.services.quiz_service import _load_archive
+from app.utils.redis_utils import leaderboard_key, participants_key, session_key
+from fastapi import HTTPException
+
+from tests.factories import make_quiz, make_session
+
+
+def test_load_archive_expands_compact_standings():
+    archive = _load_archive(
+        {
+            "_id": "ignored",
+            "session_id": "s1",
+            "standings": {"user_ids": ["u2", "u1"], "scores": [20, 10]},
+            "unranked_participants": ["idle"],
+        }
+    )
+
+    assert archive.document == {
+        "session_id": "s1",
+        "standings": [
+            {"user_id": "u2", "rank": 1, "score": 20},
+            {"user_id": "u1", "rank": 2, "score": 10},
+        ],
+        "participants": ["idle", "u1", "u2"],
+    }
+    assert archive.positions == {"u2": 0, "u1": 1}
+
+
+def test_load_archive_keeps_ranked_list_standings():
+    standings = [{"user_id": "u1", "rank": 1, "score": 10}]
+    archive = _load_archive(
+        {"session_id": "s1", "standings": standings, "participants": ["u1", "u2"]}
+    )
+
+    assert archive.document["standings"] == standings
+    assert archive.document["participants"] == ["u1", "u2"]
+    assert archive.positions == {"u1": 0}
+
+
+@pytest_asyncio.fixture
+async def finished(service, store, monkeypatch):
+    monkeypatch.setattr(service.settings, "SESSION_STATS_PRECOMPUTE", False)
+    quiz = await service.create_quiz(make_quiz())
+    session = make_session(participants=["u1", "u2", "idle"], quiz_id=quiz.id)
+    await store.save(session)
+    await service.db.sessions.insert_one(session.model_dump())
+    for user_id, points in (("u1", 10), ("u2", 20)):
+        await store.score_answer("s1", user_id, "q0", points, True, 30, "a")
+    await store.update_header("s1", status="completed")
+    await service.db.sessions.update_one(
+        {"id": "s1"}, {"$set": {"status": "completed"}}
+    )
+
+    await service.finish_session("s1")
+    return service
+
+
+@pytest.mark.asyncio
+async def test_finish_session_stores_a_compact_archive(finished, redis):
+    stored = await finished.db.session_archives.find_one({"session_id": "s1"})
+
+    assert stored["standings"] == {"user_ids": ["u2", "u1"], "scores": [20, 10]}
+    assert stored["unranked_participants"] == ["idle"]
+    assert stored["distributions"] == {"q0": {"a": 2}, "q1": {}}
+    for key in (session_key("s1"), participants_key("s1"), leaderboard_key("s1")):
+        assert await redis.exists(key) == 0
+
+
+@pytest.mark.asyncio
+async def test_reads_fall_back_to_the_archive(finished):
+    finished.archives.clear()
+
+    ranks = await finished.get_ranks("s1", ["u1", "idle"])
+    page = await finished.get_leaderboard_page("s1", cursor=1, limit=5)
+    window = await finished.get_rank_window("s1", "u2", radius=1)
+
+    assert ranks["ranks"] == [
+        {"user_id": "u1", "rank": 2, "score": 10},
+        {"user_id": "idle", "rank": None, "score": None},
+    ]
+    assert page["entries"] == [{"user_id": "u1", "rank": 2, "score": 10}]
+    assert page["total"] == 2
+    assert [entry["user_id"] for entry in window["entries"]] == ["u2", "u1"]
+    assert (await finished.get_archive("s1")).document["participants"] == [
+        "idle",
+        "u1",
+        "u2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_archive_is_not_served_for_a_live_session(service, store):
+    await store.save(make_session())
+    await service.db.session_archives.insert_one(
+        {"session_id": "s1", "standings": [], "participants": []}
+    )
+
+    assert await service.get_archive("s1") is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cached", [True, False])
+async def test_answers_after_completion_are_refused_as_conflicts(finished, cached):
+    if not cached:
+        # Another node, which neither archived nor cached the session
+        finished.archives.clear()
+        finished.session_quiz_ids.clear()
+
+    with pytest.raises(HTTPException) as error:
+        await finished.submit_answer(
+            Answer(session_id="s1", question_id="q1", user_id="u1", answer="a")
+        )
+
+    assert error.value.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_answers_to_unknown_sessions_are_not_found(service):
+    with pytest.raises(HTTPException) as error:
+        await service.submit_answer(
+            Answer(session_id="nope", question_id="q0", user_id="u1", answer="a")
+        )
+
+    assert error.value.status_code == 404
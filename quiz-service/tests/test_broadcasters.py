@@ -0,0 +1,65 @@
+import pytest
+from app.websockets import broadcasters
+from app.websockets.broadcasters import RosterDeltaBatcher
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    messages = []
+
+    async def broadcast_to_session(session_id, message, exclude_user=None):
+        messages.append(message)
+
+    monkeypatch.setattr(
+        broadcasters.manager, "broadcast_to_session", broadcast_to_session
+    )
+    return messages
+
+
+def delta(from_version, version, joined=(), left=()):
+    return {
+        "type": "roster_delta",
+        "session_id": "s1",
+        "from_version": from_version,
+        "version": version,
+        "joined": list(joined),
+        "left": list(left),
+    }
+
+
+@pytest.mark.asyncio
+async def test_contiguous_changes_form_one_delta(sent):
+    batcher = RosterDeltaBatcher()
+    await batcher._flush("s1", [(4, "b", True), (3, "a", True), (5, "c", True)])
+
+    assert sent == [delta(2, 5, joined=["a", "b", "c"])]
+
+
+@pytest.mark.asyncio
+async def test_version_gaps_split_deltas(sent):
+    batcher = RosterDeltaBatcher()
+    await batcher._flush(
+        "s1", [(3, "a", True), (4, "b", True), (7, "a", False), (9, "c", True)]
+    )
+
+    assert sent == [
+        delta(2, 4, joined=["a", "b"]),
+        delta(6, 7, left=["a"]),
+        delta(8, 9, joined=["c"]),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_last_change_of_a_user_within_a_run_wins(sent):
+    batcher = RosterDeltaBatcher()
+    await batcher._flush("s1", [(2, "a", True), (3, "a", False), (4, "b", True)])
+
+    assert sent == [delta(1, 4, joined=["b"], left=["a"])]
+
+
+def test_changes_without_a_version_are_not_recorded():
+    batcher = RosterDeltaBatcher()
+    batcher.record("s1", "a", True, 0)
+    batcher.record("s1", "b", True, 1)
+
+    assert batcher._pending == {"s1": [(1, "b", True)]}
@@ -0,0 +1,102 @@
+import pytest
+from app.utils import cache as cache_module
+from app.utils.cache import TTLCache
+from bson import ObjectId
+from prometheus_client import REGISTRY
+
+from tests.factories import make_quiz, make_session
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_their_ttl(clock):
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache.set("a", 1)
+
+    clock[0] += 9.9
+    assert cache.get("a") == 1
+    clock[0] += 0.2
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats() == {"size": 2, "hits": 3, "misses": 1, "evictions": 1}
+
+
+def test_setting_again_refreshes_the_ttl(clock):
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    clock[0] += 8
+    cache.set("a", 2)
+    clock[0] += 8
+
+    assert cache.get("a") == 2
+
+
+def test_invalidate_and_clear():
+    cache = TTLCache()
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.invalidate("a")
+    cache.invalidate("missing")
+    assert cache.get("a") is None
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_named_cache_exports_metrics():
+    def sample(name, **labels):
+        return REGISTRY.get_sample_value(name, {"cache": "test_metrics", **labels}) or 0
+
+    cache = TTLCache(maxsize=1, name="test_metrics")
+    before = sample("quiz_cache_lookups_total", result="hit")
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    cache.set("b", 2)
+
+    assert sample("quiz_cache_lookups_total", result="hit") == before + 1
+    assert sample("quiz_cache_lookups_total", result="miss") >= 1
+    assert sample("quiz_cache_evictions_total") >= 1
+    assert sample("quiz_cache_entries") == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_quiz_reloads_a_modified_answer_key(service):
+    quiz = await service.create_quiz(make_quiz())
+    assert (await service.get_answer_key(quiz.id))["q0"].correct_answer == "a"
+    await service.db.quizzes.update_one(
+        {"_id": ObjectId(quiz.id)}, {"$set": {"questions.0.correct_answer": "b"}}
+    )
+
+    assert (await service.get_answer_key(quiz.id))["q0"].correct_answer == "a"
+    service.invalidate_quiz(quiz.id)
+    assert (await service.get_answer_key(quiz.id))["q0"].correct_answer == "b"
+
+
+@pytest.mark.asyncio
+async def test_invalidate_session_drops_its_quiz_id_and_snapshot(service, store):
+    await store.save(make_session(status="waiting"))
+    assert await service.get_session_quiz_id("s1") == "quiz1"
+    assert await service.get_session_snapshot("s1") is not None
+
+    service.invalidate_session("s1")
+
+    assert service.session_quiz_ids.get("s1") is None
+    assert service.session_snapshots.get("s1") is None
@@ -0,0 +1,116 @@
+import zlib
+
+import msgpack
+import pytest
+from app.websockets.codec import (
+    FLAG_DEFLATE,
+    FLAG_RAW,
+    JSON_CODEC,
+    MESSAGE_CODES,
+    JsonCodec,
+    MalformedMessage,
+    MessageTemplate,
+    MsgpackCodec,
+)
+
+
+def inflate(frame: bytes) -> dict:
+    """Decode an outbound frame the way a client does"""
+    body = zlib.decompress(frame[1:]) if frame[0] == FLAG_DEFLATE else frame[1:]
+    return msgpack.unpackb(body)
+
+
+def test_msgpack_round_trip_uses_numeric_types():
+    codec = MsgpackCodec()
+    frame = codec.encode({"type": "answer", "answer": "a"})
+
+    assert frame[0] == FLAG_RAW
+    assert inflate(frame) == {"type": MESSAGE_CODES["answer"], "answer": "a"}
+    assert codec.decode(frame) == {"type": "answer", "answer": "a"}
+
+
+def test_msgpack_compresses_from_the_threshold_of_the_type():
+    codec = MsgpackCodec({"session_state": 64, "default": 0})
+    large = {"type": "session_state", "questions": ["x" * 10] * 20}
+    small = {"type": "session_state", "questions": []}
+
+    assert codec.encode(large)[0] == FLAG_DEFLATE
+    assert inflate(codec.encode(large))["questions"] == large["questions"]
+    assert codec.encode(small)[0] == FLAG_RAW
+    assert codec.encode({**large, "type": "next_question"})[0] == FLAG_RAW
+
+
+def test_msgpack_accepts_json_text_frames():
+    assert MsgpackCodec().decode('{"type":"ping"}') == {"type": "ping"}
+
+
+@pytest.mark.parametrize(
+    "frame",
+    [
+        b"",
+        bytes([FLAG_DEFLATE]) + zlib.compress(msgpack.packb({"type": 10})),
+        bytes([FLAG_RAW]) + b"\xc1",
+        bytes([FLAG_RAW]) + msgpack.packb([1, 2]),
+    ],
+)
+def test_msgpack_rejects_malformed_frames(frame):
+    with pytest.raises(MalformedMessage):
+        MsgpackCodec().decode(frame)
+
+
+@pytest.mark.parametrize("payload", ["{", "[1]", '"text"'])
+def test_json_rejects_malformed_frames(payload):
+    with pytest.raises(MalformedMessage):
+        JSON_CODEC.decode(payload)
+
+
+STATIC = {
+    "type": "session_state",
+    "session_id": "s1",
+    "status": "waiting",
+    "questions": [{"id": "q0", "options": ["a", "b"]}],
+}
+
+
+@pytest.mark.parametrize(
+    "codec", [JSON_CODEC, MsgpackCodec(), MsgpackCodec({"session_state": 1})]
+)
+def test_template_splices_fields_into_the_static_part(codec):
+    template = MessageTemplate(STATIC)
+    first = template.render(participants=["u1"], roster_version=1)
+    second = template.render(participants=["u1", "u2"], roster_version=2)
+
+    expected = {**STATIC, "participants": ["u1", "u2"], "roster_version": 2}
+    payload = second.for_codec(codec)
+    if codec.binary:
+        assert inflate(payload) == {
+            **expected,
+            "type": MESSAGE_CODES["session_state"],
+        }
+    else:
+        assert codec.decode(payload) == expected
+    assert first.message == {**STATIC, "participants": ["u1"], "roster_version": 1}
+
+
+def test_template_encodes_its_static_part_once_per_codec(monkeypatch):
+    template = MessageTemplate(STATIC)
+    encoded = []
+    original = JsonCodec.encode_fields
+
+    def encode_fields(self, fields):
+        encoded.append(dict(fields))
+        return original(self, fields)
+
+    monkeypatch.setattr(JsonCodec, "encode_fields", encode_fields)
+    for version in range(3):
+        template.render(roster_version=version).for_codec(JSON_CODEC)
+
+    assert encoded.count(STATIC) == 1
+
+
+def test_template_with_sixteen_or_more_fields():
+    static = {"type": "session_state", **{f"k{i}": i for i in range(15)}}
+    message = MessageTemplate(static).render(extra=True)
+
+    frame = message.for_codec(MsgpackCodec())
+    assert MsgpackCodec().decode(frame) == {**static, "extra": True}
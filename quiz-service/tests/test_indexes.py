@@ -0,0 +1,55 @@
+import pytest
+from app.core.config import get_settings
+from app.db.indexes import ensure_indexes, get_index_definitions
+from mongomock_motor import AsyncMongoMockClient
+
+
+def ttl_indexes() -> dict:
+    return {
+        collection: model.document["name"]
+        for collection, models in get_index_definitions().items()
+        for model in models
+        if "expireAfterSeconds" in model.document
+    }
+
+
+@pytest.fixture
+def settings():
+    return get_settings()
+
+
+def test_only_sessions_expire_by_default():
+    assert ttl_indexes() == {"sessions": "start_time_ttl"}
+
+
+def test_results_retention_is_a_separate_setting(settings, monkeypatch):
+    monkeypatch.setattr(settings, "MONGODB_RETENTION_DAYS", 0)
+    monkeypatch.setattr(settings, "MONGODB_RESULTS_RETENTION_DAYS", 7)
+
+    assert ttl_indexes() == {
+        "answers": "timestamp_ttl",
+        "session_archives": "archived_at_ttl",
+        "session_stats": "computed_at_ttl",
+    }
+    (model,) = [
+        model
+        for model in get_index_definitions()["answers"]
+        if model.document["name"] == "timestamp_ttl"
+    ]
+    assert model.document["expireAfterSeconds"] == 7 * 24 * 3600
+
+
+@pytest.mark.asyncio
+async def test_disabled_retention_drops_existing_ttl_indexes(settings, monkeypatch):
+    db = AsyncMongoMockClient()["quiz_test"]
+    monkeypatch.setattr(settings, "MONGODB_RESULTS_RETENTION_DAYS", 30)
+    await ensure_indexes(db)
+    assert "timestamp_ttl" in await db.answers.index_information()
+
+    monkeypatch.setattr(settings, "MONGODB_RESULTS_RETENTION_DAYS", 0)
+    await ensure_indexes(db)
+
+    assert "timestamp_ttl" not in await db.answers.index_information()
+    assert "archived_at_ttl" not in await db.session_archives.index_information()
+    assert "start_time_ttl" in await db.sessions.index_information()
+    assert "session_question_user" in await db.answers.index_information()
@@ -0,0 +1,62 @@
+import pytest
+import pytest_asyncio
+from app.utils.redis_utils import leaderboard_key
+from fastapi import HTTPException
+
+
+@pytest_asyncio.fixture
+async def ranked(service, redis):
+    # u0 scores 0 and ranks last, u19 scores 19 and ranks first
+    await redis.zadd(leaderboard_key("s1"), {f"u{i}": i for i in range(20)})
+    return service
+
+
+def ranks(window) -> list:
+    return [entry["rank"] for entry in window["entries"]]
+
+
+@pytest.mark.asyncio
+async def test_rank_window_is_centred_on_the_user(ranked):
+    window = await ranked.get_rank_window("s1", "u10", radius=3)
+
+    assert window["user"] == {"user_id": "u10", "rank": 10, "score": 10}
+    assert ranks(window) == list(range(7, 14))
+    assert window["entries"][3]["user_id"] == "u10"
+    assert window["total"] == 20
+
+
+@pytest.mark.asyncio
+async def test_rank_window_is_cut_at_the_top_and_bottom(ranked):
+    top = await ranked.get_rank_window("s1", "u19", radius=3)
+    bottom = await ranked.get_rank_window("s1", "u0", radius=3)
+
+    assert ranks(top) == [1, 2, 3, 4]
+    assert ranks(bottom) == [17, 18, 19, 20]
+
+
+@pytest.mark.asyncio
+async def test_rank_window_radius_is_capped(ranked, monkeypatch):
+    monkeypatch.setattr(ranked.settings, "LEADERBOARD_MAX_BATCH", 4)
+
+    window = await ranked.get_rank_window("s1", "u10", radius=50)
+
+    assert ranks(window) == list(range(8, 13))
+
+
+@pytest.mark.asyncio
+async def test_rank_window_of_user_without_score(ranked):
+    with pytest.raises(HTTPException) as error:
+        await ranked.get_rank_window("s1", "nobody")
+
+    assert error.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_leaderboard_pages_follow_the_cursor(ranked):
+    first = await ranked.get_leaderboard_page("s1", cursor=0, limit=8)
+    last = await ranked.get_leaderboard_page("s1", cursor=16, limit=8)
+
+    assert [entry["rank"] for entry in first["entries"]] == list(range(1, 9))
+    assert first["next_cursor"] == 8
+    assert [entry["rank"] for entry in last["entries"]] == [17, 18, 19, 20]
+    assert last["next_cursor"] is None
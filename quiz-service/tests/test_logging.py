@@ -0,0 +1,87 @@
+import json
+import logging
+import queue
+
+import pytest
+from app.core import logging as log_setup
+from app.core.logging import JsonFormatter, LazyQueueHandler, RecordLimiter
+
+
+def record(name="app.test", level=logging.INFO, msg="hello %s", args=("world",)):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(log_setup.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_longest_prefix_rule_wins():
+    limiter = RecordLimiter({"": 0.5, "app": 0.0, "app.services": 1.0}, {})
+
+    assert limiter._rule("app.services.quiz_service") == (1.0, 0.0)
+    assert limiter._rule("app.api") == (0.0, 0.0)
+    assert limiter._rule("application") == (0.5, 0.0)
+    assert limiter._rule("uvicorn") == (0.5, 0.0)
+
+
+def test_sampling_only_thins_records_below_warning(monkeypatch):
+    monkeypatch.setattr(log_setup.random, "random", lambda: 0.6)
+    limiter = RecordLimiter({"app": 0.5}, {})
+
+    assert not limiter.filter(record(level=logging.INFO))
+    assert limiter.filter(record(level=logging.WARNING))
+    assert limiter.filter(record(name="other"))
+    monkeypatch.setattr(log_setup.random, "random", lambda: 0.4)
+    assert limiter.filter(record(level=logging.DEBUG))
+
+
+def test_rate_limit_reports_suppressed_records(clock):
+    limiter = RecordLimiter({}, {"app": 2.0})
+
+    passed = [limiter.filter(record()) for _ in range(5)]
+    clock[0] += 0.5
+    resumed = record()
+
+    assert passed == [True, True, False, False, False]
+    assert limiter.filter(resumed)
+    assert resumed.suppressed == 3
+    assert not limiter.filter(record())
+
+
+def test_rate_limits_are_per_logger(clock):
+    limiter = RecordLimiter({}, {"app": 1.0})
+
+    assert limiter.filter(record(name="app.a"))
+    assert limiter.filter(record(name="app.b"))
+    assert not limiter.filter(record(name="app.a"))
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = LazyQueueHandler(queue.Queue(1))
+    first = record()
+
+    handler.handle(first)
+    handler.handle(record())
+
+    assert handler.queue.qsize() == 1
+    # Records are queued unformatted, interpolation happens on the writer
+    queued = handler.queue.get_nowait()
+    assert queued is first
+    assert queued.args == ("world",)
+
+
+def test_json_formatter_puts_extra_fields_at_the_top_level():
+    entry = record()
+    entry.session_id = "s1"
+    entry.suppressed = 2
+
+    line = json.loads(JsonFormatter().format(entry))
+
+    assert line["message"] == "hello world"
+    assert line["level"] == "INFO"
+    assert line["logger"] == "app.test"
+    assert line["session_id"] == "s1"
+    assert line["suppressed"] == 2
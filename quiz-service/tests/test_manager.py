@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from app.websockets.manager import ConnectionManager
+from fastapi import status
+from starlette.websockets import WebSocketState
+
+
+class FakeWebSocket:
+    def __init__(self, stalled: bool = False):
+        self.application_state = WebSocketState.CONNECTED
+        self.sent = []
+        self.closed_with = None
+        # A stalled socket never completes a send, like a client not reading
+        self._unblocked = asyncio.Event()
+        if not stalled:
+            self._unblocked.set()
+
+    async def send_text(self, payload):
+        await self._unblocked.wait()
+        self.sent.append(payload)
+
+    async def send_bytes(self, payload):
+        await self.send_text(payload)
+
+    async def close(self, code=status.WS_1000_NORMAL_CLOSURE):
+        self.closed_with = code
+        self.application_state = WebSocketState.DISCONNECTED
+
+
+@pytest_asyncio.fixture
+async def managers():
+    """Builds ConnectionManagers and stops their writers afterwards"""
+    created = []
+
+    def build(**kwargs) -> ConnectionManager:
+        created.append(ConnectionManager(**kwargs))
+        return created[-1]
+
+    yield build
+    for manager in created:
+        for connection in list(manager._connections.values()):
+            connection.abort()
+    await settle()
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_broadcast_reaches_every_socket_but_the_excluded_one(managers):
+    manager = managers(max_queue_size=8)
+    sockets = {user: FakeWebSocket() for user in ("u1", "u2", "u3")}
+    for user, websocket in sockets.items():
+        await manager.connect(websocket, "s1", user)
+
+    await manager.broadcast_to_session("s1", {"type": "ping"}, exclude_user="u2")
+    await settle()
+
+    assert sockets["u1"].sent == ['{"type":"ping"}']
+    assert sockets["u2"].sent == []
+    assert sockets["u3"].sent == ['{"type":"ping"}']
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_is_evicted_without_holding_up_others(managers):
+    manager = managers(max_queue_size=2)
+    fast, slow = FakeWebSocket(), FakeWebSocket(stalled=True)
+    await manager.connect(fast, "s1", "fast")
+    await manager.connect(slow, "s1", "slow")
+
+    for i in range(4):
+        await manager.broadcast_to_session("s1", {"type": "ping", "n": i})
+        await settle()
+
+    assert len(fast.sent) == 4
+    assert fast.closed_with is None
+    # One send in flight and two queued, the fourth overflowed the queue
+    assert slow.closed_with == status.WS_1013_TRY_AGAIN_LATER
+    assert slow.sent == []
+    assert manager._connections[slow].closing
+
+
+@pytest.mark.asyncio
+async def test_personal_send_to_full_queue_evicts(managers):
+    manager = managers(max_queue_size=1)
+    slow = FakeWebSocket(stalled=True)
+    await manager.connect(slow, "s1", "slow")
+
+    results = []
+    for _ in range(3):
+        results.append(await manager.send_personal(slow, {"type": "ping"}))
+        await settle()
+
+    assert results == [True, True, False]
+    assert slow.closed_with == status.WS_1013_TRY_AGAIN_LATER
+
+
+@pytest.mark.asyncio
+async def test_reconnect_replaces_and_closes_the_previous_socket(managers):
+    manager = managers()
+    first, second = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(first, "s1", "u1")
+    await manager.connect(second, "s1", "u1")
+
+    assert first.closed_with == status.WS_1008_POLICY_VIOLATION
+    assert '"type":"connection_closed"' in first.sent[0]
+    assert manager.get_user_connection_count("s1", "u1") == 1
+    assert await manager.disconnect(second, "s1", "u1") is True
+    assert manager.get_session_count() == 0
@@ -0,0 +1,55 @@
+from typing import List
+
+import pytest
+from app.utils.ndjson import iter_lines
+
+
+async def collect(chunks: List[bytes], max_line_bytes: int = 8) -> list:
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    return [line async for line in iter_lines(stream(), max_line_bytes)]
+
+
+@pytest.mark.asyncio
+async def test_lines_split_across_chunks():
+    lines = await collect([b'{"a"', b":1}\n{", b'"b":2}', b"\n"])
+
+    assert lines == [(1, b'{"a":1}'), (2, b'{"b":2}')]
+
+
+@pytest.mark.asyncio
+async def test_blank_lines_are_counted_but_skipped():
+    lines = await collect([b"one\n\n  \ntwo\n"])
+
+    assert lines == [(1, b"one"), (4, b"two")]
+
+
+@pytest.mark.asyncio
+async def test_last_line_without_newline():
+    assert await collect([b"one\ntw", b"o"]) == [(1, b"one"), (2, b"two")]
+
+
+@pytest.mark.asyncio
+async def test_oversized_line_in_one_chunk():
+    lines = await collect([b"123456789\nok\n"])
+
+    assert lines == [(1, None), (2, b"ok")]
+
+
+@pytest.mark.asyncio
+async def test_oversized_line_across_chunks_is_not_buffered():
+    lines = await collect([b"12345", b"67890", b"abcdef", b"gh\nok"])
+
+    assert lines == [(1, None), (2, b"ok")]
+
+
+@pytest.mark.asyncio
+async def test_oversized_last_line():
+    assert await collect([b"ok\n", b"123456789"]) == [(1, b"ok"), (2, None)]
+
+
+@pytest.mark.asyncio
+async def test_line_of_exactly_the_limit_is_kept():
+    assert await collect([b"1234", b"5678\n"]) == [(1, b"12345678")]
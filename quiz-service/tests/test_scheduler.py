@@ -0,0 +1,56 @@
+from app.services.scheduler import HierarchicalTimerWheel
+
+
+def run(wheel: HierarchicalTimerWheel, ticks: int) -> dict:
+    """Advance ``ticks`` times and map each expired key to its tick"""
+    fired = {}
+    for _ in range(ticks):
+        for key in wheel.advance():
+            fired[key] = wheel.current_tick
+    return fired
+
+
+def test_timers_fire_on_their_tick_across_levels():
+    wheel = HierarchicalTimerWheel(slots=4, levels=3)
+    delays = {f"t{ticks}": ticks for ticks in (1, 3, 4, 5, 15, 16, 17, 40, 63)}
+    for key, ticks in delays.items():
+        wheel.schedule(key, ticks)
+
+    assert run(wheel, 63) == delays
+    assert len(wheel) == 0
+
+
+def test_timers_scheduled_mid_rotation_fire_on_time():
+    wheel = HierarchicalTimerWheel(slots=4, levels=3)
+    run(wheel, 7)
+    wheel.schedule("a", 9)
+    wheel.schedule("b", 20)
+
+    assert run(wheel, 30) == {"a": 16, "b": 27}
+
+
+def test_cancel_and_reschedule():
+    wheel = HierarchicalTimerWheel(slots=4, levels=3)
+    wheel.schedule("cancelled", 5)
+    wheel.schedule("moved", 5)
+    wheel.cancel("cancelled")
+    wheel.schedule("moved", 10)
+
+    assert "cancelled" not in wheel
+    assert "moved" in wheel
+    assert len(wheel) == 1
+    assert run(wheel, 12) == {"moved": 10}
+
+
+def test_non_positive_delay_fires_on_next_tick():
+    wheel = HierarchicalTimerWheel(slots=4, levels=2)
+    wheel.schedule("now", 0)
+
+    assert wheel.advance() == ["now"]
+
+
+def test_deadline_beyond_horizon_is_clamped():
+    wheel = HierarchicalTimerWheel(slots=4, levels=2)
+    wheel.schedule("far", 100)
+
+    assert run(wheel, 100) == {"far": 15}
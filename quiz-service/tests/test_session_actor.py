@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from app.services import session_actor
+from app.services.session_actor import ActorStopped, CommandRejected, SessionActors
+from mongomock_motor import AsyncMongoMockClient
+
+from tests.factories import make_session
+
+
+@pytest_asyncio.fixture
+async def actors(store):
+    sessions = AsyncMongoMockClient()["quiz_test"]["sessions"]
+    session = make_session(status="waiting", participants=["u1"])
+    await store.save(session)
+    await sessions.insert_one(session.model_dump())
+    registry = SessionActors(store, sessions, batch_size=3)
+    yield registry
+    await registry.stop()
+
+
+@pytest.fixture
+def batches(store, monkeypatch):
+    """Roster changes of each Redis transaction the actors send"""
+    sent = []
+    write_batch = store.write_batch
+
+    async def recording(session_id, header, roster):
+        sent.append(list(roster))
+        await write_batch(session_id, header, roster)
+
+    monkeypatch.setattr(store, "write_batch", recording)
+    return sent
+
+
+@pytest.mark.asyncio
+async def test_queued_commands_are_persisted_in_batches(actors, store, batches):
+    actor = await actors.get("s1")
+
+    versions = await asyncio.gather(
+        *(
+            actor.execute(session_actor.add_participant(f"p{i}"))
+            for i in range(5)
+        )
+    )
+
+    assert [len(batch) for batch in batches] == [3, 2]
+    # Roster versions are assigned in command order, after the one save made
+    assert versions == [2, 3, 4, 5, 6]
+    version, participants = await store.get_roster("s1")
+    assert version == 6
+    assert participants == ["p0", "p1", "p2", "p3", "p4", "u1"]
+    stored = await actor.collection.find_one({"id": "s1"})
+    assert sorted(stored["participants"]) == participants
+
+
+@pytest.mark.asyncio
+async def test_unchanged_roster_returns_none(actors, batches):
+    actor = await actors.get("s1")
+
+    assert await actor.execute(session_actor.add_participant("u1")) is None
+    assert await actor.execute(session_actor.remove_participant("nobody")) is None
+    assert batches == []
+
+
+@pytest.mark.asyncio
+async def test_rejected_command_does_not_affect_its_batch(actors, store):
+    actor = await actors.get("s1")
+
+    first, second, joined = await asyncio.gather(
+        actor.execute(session_actor.start_session()),
+        actor.execute(session_actor.start_session()),
+        actor.execute(session_actor.add_participant("u2")),
+        return_exceptions=True,
+    )
+
+    assert first["id"] == "q0"
+    assert isinstance(second, CommandRejected)
+    assert joined == 2
+    header = await store.get_header("s1")
+    assert header["status"] == "active"
+    assert header["current_question_id"] == "q0"
+    assert actor.running
+
+
+@pytest.mark.asyncio
+async def test_failed_persist_stops_the_actor(actors, store, monkeypatch):
+    actor = await actors.get("s1")
+
+    async def failing(session_id, header, roster):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(store, "write_batch", failing)
+    with pytest.raises(ConnectionError):
+        await actor.execute(session_actor.add_participant("u2"))
+    await asyncio.sleep(0)
+
+    assert not actor.running
+    with pytest.raises(ActorStopped):
+        await actor.execute(session_actor.add_participant("u3"))
+    monkeypatch.undo()
+    # The next access reloads the session from Redis, without the lost change
+    reloaded = await actors.get("s1")
+    assert reloaded is not actor
+    assert reloaded.participants == {"u1"}
+
+
+@pytest.mark.asyncio
+async def test_sessions_missing_from_redis_have_no_actor(actors):
+    assert await actors.get("unknown") is None
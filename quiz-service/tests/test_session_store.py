@@ -0,0 +1,111 @@
+import pytest
+from app.utils.redis_utils import answered_key, distribution_key, leaderboard_key
+from tests.factories import make_session
+
+
+async def score(store, user_id="u1", question_id="q0", correct=True, option="a"):
+    return await store.score_answer(
+        "s1",
+        user_id,
+        question_id,
+        points=10 if correct else 0,
+        is_correct=correct,
+        window=30,
+        option=option,
+    )
+
+
+@pytest.mark.asyncio
+async def test_answer_scores_and_returns_the_leaderboard(store):
+    await store.save(make_session())
+
+    result = await score(store)
+    other = await score(store, "u2", correct=False)
+
+    assert result["status"] == "ok"
+    assert result["total_score"] == 10
+    assert result["leaderboard"] == [{"user_id": "u1", "score": 10}]
+    assert other["total_score"] == 0
+    assert other["leaderboard"] == [
+        {"user_id": "u1", "score": 10},
+        {"user_id": "u2", "score": 0},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_scores_accumulate_across_questions(store):
+    await store.save(make_session())
+    await score(store, question_id="q0")
+    await store.update_header("s1", current_question=1, current_question_id="q1")
+
+    result = await score(store, question_id="q1")
+
+    assert result["total_score"] == 20
+
+
+@pytest.mark.asyncio
+async def test_duplicate_returns_first_outcome_without_scoring_again(store, redis):
+    await store.save(make_session())
+    await score(store, correct=True, option="a")
+
+    result = await score(store, correct=False, option="b")
+
+    assert await redis.get(answered_key("s1", "q0", "u1")) == "1:10:10"
+    assert result["status"] == "duplicate"
+    assert result["is_correct"] is True
+    assert result["points"] == 10
+    assert result["total_score"] == 10
+    assert result["leaderboard"] == [{"user_id": "u1", "score": 10}]
+
+
+@pytest.mark.asyncio
+async def test_answer_scores_again_once_its_marker_expired(store, redis):
+    await store.save(make_session())
+    await score(store)
+    await redis.delete(answered_key("s1", "q0", "u1"))
+
+    result = await score(store)
+
+    assert result["status"] == "ok"
+    assert result["total_score"] == 20
+
+
+@pytest.mark.asyncio
+async def test_options_are_counted_per_first_answer(store):
+    await store.save(make_session())
+
+    await score(store, "u1", option="a")
+    await score(store, "u2", correct=False, option="b")
+    await score(store, "u3", option="a")
+    await score(store, "u4", correct=False, option=None)
+    await score(store, "u1", option="b")
+
+    assert await store.get_distribution("s1", "q0") == {"a": 2, "b": 1}
+    assert await store.get_distributions("s1", ["q0", "q1"]) == {
+        "q0": {"a": 2, "b": 1},
+        "q1": {},
+    }
+
+
+@pytest.mark.asyncio
+async def test_answer_to_another_question_is_stale(store, redis):
+    await store.save(make_session(current_question=1))
+
+    result = await score(store, question_id="q0")
+
+    assert result == {"status": "stale"}
+    assert await redis.exists(leaderboard_key("s1")) == 0
+    assert await redis.exists(answered_key("s1", "q0", "u1")) == 0
+    assert await redis.exists(distribution_key("s1", "q0")) == 0
+
+
+@pytest.mark.asyncio
+async def test_answer_before_start_is_stale(store):
+    await store.save(make_session(status="waiting"))
+
+    assert await score(store) == {"status": "stale"}
+
+
+@pytest.mark.asyncio
+async def test_unknown_session_is_missing(store):
+    assert await score(store) == {"status": "missing"}
@@ -0,0 +1,45 @@
+import pytest
+import pytest_asyncio
+from app.db.indexes import ensure_indexes
+from app.services import quiz_service as quiz_service_module
+from bson import ObjectId
+from fastapi import HTTPException
+
+from tests.factories import make_quiz
+
+
+@pytest_asyncio.fixture
+async def quiz_id(service):
+    await ensure_indexes(service.db)
+    return (await service.create_quiz(make_quiz())).id
+
+
+@pytest.mark.asyncio
+async def test_sessions_created_together_get_distinct_ids(service, quiz_id):
+    first = await service.create_session(quiz_id)
+    second = await service.create_session(quiz_id)
+
+    assert first.id != second.id
+    assert await service.db.sessions.count_documents({}) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_create_leaves_the_live_session_alone(
+    service, store, quiz_id, monkeypatch
+):
+    fixed = ObjectId()
+
+    def object_id(*args):
+        # Parsing quiz ids still works, new ids all collide
+        return ObjectId(*args) if args else fixed
+
+    monkeypatch.setattr(quiz_service_module, "ObjectId", object_id)
+    session = await service.create_session(quiz_id)
+    await store.add_participant(session.id, "alice")
+
+    with pytest.raises(HTTPException) as error:
+        await service.create_session(quiz_id)
+
+    assert error.value.status_code == 500
+    _, participants = await store.get_roster(session.id)
+    assert participants == ["alice"]